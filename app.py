@@ -1,49 +1,112 @@
-from flask import Flask, render_template, request
-from datetime import datetime
-from modules.scraper import fetch_article
-from modules.list_mode import split_list_items, build_events_from_items
-from modules.event_extractor import split_sentences, sentences_with_dates, cluster_events
-from modules.timeline_builder import build_timeline, to_export_rows
-from modules.event_summarizer import summarize_event
-from modules.date_extractor import extract_date_mentions
+import argparse
+from flask import Flask, render_template, request, jsonify
+from modules.pipeline import TimelinePipeline
+from modules.jobs import JobQueue
+from modules.timeline_store import TimelineStore
+from modules.text_rules import reload_rules
+from modules.settings import TIMELINE_QUERY_LIMIT
 
 app = Flask(__name__)
+pipeline = TimelinePipeline()
+jobs = JobQueue()
+store = TimelineStore()
+rules_version = 0  # bumped by /api/reload-rules; worker processes compare it with their own copy
+
+def build_url_timeline(url, version=0):
+    """Fetch one article and build its timeline (runs on the job queue, maybe in a worker process)."""
+    global rules_version
+    if version > rules_version:  # a worker forked before the last rules reload
+        reload_rules()
+        rules_version = version
+    ctx = pipeline.run(url=url)
+    return {"result": ctx["result"], "metrics": ctx["metrics"]}
+
+def finish_url_timeline(output):
+    """Back in the web process: archive the timeline and count worker-process runs in /metrics."""
+    if jobs.processes:
+        pipeline.record(output["metrics"])
+    store.add_timeline(output["result"])
+    return output["result"]
+
+def submit_url(url):
+    return jobs.submit(url, build_url_timeline, url, rules_version, then=finish_url_timeline)
+
+def _job_view(job):
+    return {k: job[k] for k in ("id", "status", "result", "error")}
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    timeline = []
-    title = None
+    job_id = None
     error = None
 
     if request.method == "POST":
-        url = request.form.get("url")
-        try:
-            article = fetch_article(url)
-            title = article["title"]
-            text = article["text"]
-            ref_date = article["published_at"] or datetime.now()
+        url = (request.form.get("url") or "").strip()
+        if url:
+            job_id = submit_url(url)["id"]
+        else:
+            error = "Please enter a URL."
 
-            items = split_list_items(text)
+    return render_template("index.html", job_id=job_id, error=error)
 
-            if len(items) >= 3:  # List article mode
-                events = build_events_from_items(items, ref_date)
-            else:  # Normal article mode
-                sentences = split_sentences(text)
-                mentions = extract_date_mentions(text, ref_date)
-                hits = sentences_with_dates(sentences, mentions)
-                events = cluster_events(sentences, hits)
+@app.route("/api/timeline", methods=["POST"])
+def api_timeline():
+    """Queue a timeline job; repeated URLs share the pending job."""
+    data = request.get_json(silent=True) or request.form
+    url = (data.get("url") or "").strip()
+    if not url:
+        return jsonify({"error": "url is required"}), 400
+    job = submit_url(url)
+    return jsonify(_job_view(job)), 202
 
-                for e in events:
-                    e["text"] = summarize_event(e["text"])
-                    if "year" not in e:
-                        e["year"] = None
+@app.route("/api/jobs/<job_id>")
+def api_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(_job_view(job))
 
-            timeline = to_export_rows(build_timeline(events))
+@app.route("/api/events")
+def api_events():
+    """Stored events filtered by ?from=&to=&year=&source=&phrase=&limit=."""
+    args = request.args
+    try:
+        year = int(args["year"]) if args.get("year") else None
+        limit = min(int(args.get("limit") or TIMELINE_QUERY_LIMIT), TIMELINE_QUERY_LIMIT)
+    except ValueError:
+        return jsonify({"error": "year and limit must be integers"}), 400
+    rows = list(store.query(start=args.get("from"), end=args.get("to"), year=year,
+                            source_url=args.get("source"), phrase=args.get("phrase"), limit=limit))
+    return jsonify({"count": len(rows), "events": rows})
 
-        except Exception as e:
-            error = str(e)
+@app.route("/api/reload-rules", methods=["POST"])
+def api_reload_rules():
+    """
+    Re-read the sentence filter / trimming rules from settings.py without a
+    restart. Worker processes pick them up with their next job.
+    """
+    global rules_version
+    rules = reload_rules()
+    rules_version += 1
+    return jsonify({"min_len": rules.min_len, "max_len": rules.max_len})
 
-    return render_template("index.html", timeline=timeline, title=title, error=error)
+@app.route("/metrics")
+def metrics():
+    """Per-stage timings, counts and cache hits summed over pipeline runs."""
+    return jsonify(pipeline.snapshot())
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    cli = argparse.ArgumentParser(description="Timeline Extractor web app")
+    cli.add_argument("--preload", action="store_true",
+                     help="Load the spaCy model and warm regex/date caches before serving")
+    cli.add_argument("--workers", type=int, default=0,
+                     help="Build timelines in N forked worker processes sharing the preloaded model (implies --preload)")
+    args = cli.parse_args()
+
+    if args.preload or args.workers:
+        warm = pipeline.warmup()
+        print(f"Preloaded in {warm['model_seconds']:.2f}s (model) + {warm['pipeline_seconds']:.2f}s (warmup run)")
+    if args.workers:
+        jobs.shutdown()
+        jobs = JobQueue(max_workers=args.workers, processes=True)
+    # The reloader would start a second process and load everything again
+    app.run(debug=True, use_reloader=not (args.preload or args.workers))
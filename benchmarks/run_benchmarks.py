@@ -0,0 +1,193 @@
+"""
+Offline benchmark over the frozen corpus in benchmarks/corpus.
+
+Times each extraction stage and the end-to-end TimelinePipeline, reports
+throughput (articles/s, tokens/s), p50/p99 latency and peak RSS, and
+compares the numbers against benchmarks/baseline.json. Any metric that is
+worse than the baseline by more than --tolerance fails the run.
+
+    python benchmarks/run_benchmarks.py                    # compare against baseline
+    python benchmarks/run_benchmarks.py --update-baseline  # record a new baseline
+
+A missing or unreadable baseline is an error; --update-baseline is the
+only way to run without one. Timings are machine-specific: re-record the
+baseline on the machine (or CI runner image) that runs the comparison.
+"""
+import argparse
+import json
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules.fetcher import ArticleFetcher
+from modules.scraper import fetch_article
+from modules.list_mode import split_list_items
+from modules.nlp_models import parse_article, get_nlp
+from modules.event_extractor import split_sentence_spans, sentences_with_dates, cluster_events
+from modules.date_extractor import scan_date_mentions, dedupe_mentions, clear_date_cache
+from modules.event_summarizer import summarize_event
+from modules.timeline_builder import build_timeline
+from modules.pipeline import TimelinePipeline
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+MIN_COMPARED_MS = 0.05  # stages faster than this in the baseline are timer noise, not compared
+
+def load_corpus(corpus_dir: Path):
+    """Articles from the manifest: saved HTML pages (by URL) and plain-text files."""
+    manifest = json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8"))
+    corpus = []
+    for url in manifest["pages"]:
+        corpus.append({"name": url, "url": url})
+    for name in manifest["texts"]:
+        text = (corpus_dir / name).read_text(encoding="utf-8")
+        corpus.append({"name": name, "url": None,
+                       "article": {"title": name, "text": text, "published_at": None, "url": None}})
+    return corpus
+
+def _timed(timings, stage, fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    timings.setdefault(stage, []).append(time.perf_counter() - t0)
+    return out
+
+def bench_article(entry, fetcher, pipeline, timings):
+    """Run every stage once for one corpus entry; returns its token count."""
+    if entry["url"]:
+        article = _timed(timings, "extract_html", fetch_article, entry["url"], fetcher)
+    else:
+        article = entry["article"]
+    text = article["text"]
+    ref_date = article["published_at"] or datetime(2025, 1, 1)
+
+    _timed(timings, "split_list_items", split_list_items, text)
+    doc = _timed(timings, "nlp_parse", parse_article, text)
+    spans = _timed(timings, "split_sentences", split_sentence_spans, text, doc)
+    sentences = [s for s, _, _ in spans]
+    raw = _timed(timings, "extract_date_mentions", scan_date_mentions, text, ref_date, doc)
+    _timed(timings, "dedupe_mentions", dedupe_mentions, raw)
+    hits = _timed(timings, "sentences_with_dates", sentences_with_dates,
+                  sentences, raw, offsets=[(a, b) for _, a, b in spans])
+    events = _timed(timings, "cluster_events", cluster_events, sentences, hits, window=pipeline.window)
+    t0 = time.perf_counter()
+    for e in events:
+        e["text"] = summarize_event(e["text"])
+        e.setdefault("year", None)
+    timings.setdefault("summarize_event", []).append(time.perf_counter() - t0)
+    _timed(timings, "build_timeline", build_timeline, events)
+
+    if entry["url"]:
+        _timed(timings, "end_to_end", pipeline.run, url=entry["url"])
+    else:
+        _timed(timings, "end_to_end", pipeline.run, article=dict(entry["article"]))
+    return len(doc)
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+def run(corpus_dir: Path, repeats: int):
+    fetcher = ArticleFetcher(fixtures_dir=corpus_dir)
+    pipeline = TimelinePipeline(fetcher=fetcher)
+    corpus = load_corpus(corpus_dir)
+
+    # Warm-up: model load and first-call costs are not part of the numbers
+    for entry in corpus:
+        bench_article(entry, fetcher, pipeline, {})
+
+    timings = {}
+    tokens = 0
+    for _ in range(repeats):
+        clear_date_cache()
+        for entry in corpus:
+            tokens += bench_article(entry, fetcher, pipeline, timings)
+
+    e2e_total = sum(timings["end_to_end"])
+    meta = get_nlp().meta
+    return {
+        "model": f"{meta['lang']}_{meta['name']}-{meta['version']} ({', '.join(get_nlp().pipe_names)})",
+        "articles": len(corpus),
+        "repeats": repeats,
+        "throughput": {
+            "articles_per_s": len(timings["end_to_end"]) / e2e_total,
+            "tokens_per_s": tokens / e2e_total,
+        },
+        "stages_ms": {
+            stage: {"p50": statistics.median(v) * 1000, "p99": _percentile(v, 99) * 1000}
+            for stage, v in timings.items()
+        },
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def compare(report, baseline, tolerance):
+    """List of regression messages (empty when within tolerance)."""
+    problems = []
+    for key, value in report["throughput"].items():
+        base = baseline["throughput"].get(key)
+        if base and value < base * (1 - tolerance):
+            problems.append(f"{key}: {value:.1f} < baseline {base:.1f}")
+    for stage, stats in report["stages_ms"].items():
+        base = baseline["stages_ms"].get(stage)
+        if base and base["p50"] >= MIN_COMPARED_MS and stats["p50"] > base["p50"] * (1 + tolerance):
+            problems.append(f"{stage} p50: {stats['p50']:.2f}ms > baseline {base['p50']:.2f}ms")
+    base_rss = baseline.get("peak_rss_mb")
+    if base_rss and report["peak_rss_mb"] > base_rss * (1 + tolerance):
+        problems.append(f"peak RSS: {report['peak_rss_mb']:.0f}MB > baseline {base_rss:.0f}MB")
+    return problems
+
+def print_report(report):
+    t = report["throughput"]
+    print(f"Model: {report['model']}")
+    print(f"{report['articles']} articles x {report['repeats']} repeats: "
+          f"{t['articles_per_s']:.1f} articles/s, {t['tokens_per_s']:.0f} tokens/s, "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB")
+    for stage, stats in report["stages_ms"].items():
+        print(f"  {stage:<22} p50 {stats['p50']:9.3f} ms   p99 {stats['p99']:9.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline timeline extractor benchmark")
+    parser.add_argument("--corpus", default=str(CORPUS_DIR), help="Corpus directory with manifest.json")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline JSON to compare against")
+    parser.add_argument("--repeats", default=5, type=int, help="Timed passes over the corpus")
+    parser.add_argument("--tolerance", default=0.3, type=float, help="Allowed slowdown as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--json", default=None, help="Also write this run's report to a file")
+    args = parser.parse_args()
+
+    report = run(Path(args.corpus), args.repeats)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    try:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"\nERROR: cannot read baseline {baseline_path}: {e}\n"
+              f"Record one with --update-baseline.", file=sys.stderr)
+        return 2
+    if baseline.get("model") != report["model"]:
+        print(f"\nNOTE: baseline was recorded with {baseline.get('model')}", file=sys.stderr)
+
+    problems = compare(report, baseline, args.tolerance)
+    if problems:
+        print("\nPERFORMANCE REGRESSION (tolerance {:.0%}):".format(args.tolerance), file=sys.stderr)
+        for p in problems:
+            print(f"  - {p}", file=sys.stderr)
+        return 1
+    print("Within tolerance of baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Puts the repository root on sys.path, so plain `pytest` can import app and modules.
@@ -1,83 +1,403 @@
 import argparse
-from datetime import datetime
+import sys
+from itertools import islice
+from pathlib import Path
 from colorama import init, Fore, Style
 
-from modules.scraper import fetch_article
-from modules.date_extractor import extract_date_mentions
-from modules.event_extractor import split_sentences, sentences_with_dates, cluster_events
-from modules.list_mode import split_list_items, build_events_from_items
-from modules.timeline_builder import build_timeline, to_export_rows
-from modules.io_utils import save_json, save_csv
-from modules.event_summarizer import summarize_event
+from modules.scraper import fetch_article, fetch_articles, set_fetcher
+from modules.fetcher import ArticleFetcher, FetchError
+from modules.article_cache import ArticleCache
+from modules.list_mode import split_list_items
+from modules.io_utils import (
+    save_json, save_csv, iter_batch_inputs, iter_timeline_results, JsonlWriter, CsvWriter, truncate_output
+)
+from modules.nlp_models import parse_many, set_profile
+from modules.pipeline import TimelinePipeline, EmptyArticleError
+from modules.incremental import IncrementalTimeline
+from modules.timeline_store import TimelineStore
+from modules.timeline_builder import to_export_rows
+from modules.settings import (
+    SPACY_BATCH_SIZE, SPACY_N_PROCESS, SPACY_PROFILE, SPACY_PROFILES, ARTICLE_CACHE_PATH,
+    EVENT_WINDOW, LIST_MIN_ITEMS, TIMELINE_STORE_PATH, TIMELINE_STORE_BATCH, EVENT_TOP_K, EVENT_BUDGET,
+    SCHED_ARTICLE_TIMEOUT, SCHED_MAX_MEMORY_MB
+)
 
 init(autoreset=True)
 
-def main():
-    parser = argparse.ArgumentParser(description="Timeline Extractor - TOI compatible version (no AI)")
-    parser.add_argument("--url", required=True, help="News article URL")
-    parser.add_argument("--window", default=1, type=int, help="Context lines to include")
-    parser.add_argument("--out", default="timeline.json", help="Output JSON file")
-    parser.add_argument("--csv", default=None, help="Optional CSV export path")
-    args = parser.parse_args()
+def _print_profile(metrics, label="Run"):
+    """Per-stage wall time and counts, as recorded by TimelinePipeline."""
+    print(f"{Fore.CYAN}⏱ {label} profile{Style.RESET_ALL}")
+    for name, secs in metrics["stage_seconds"].items():
+        print(f"  {name:<12} {secs * 1000:9.1f} ms")
+    print("  " + ", ".join(f"{k}={v}" for k, v in metrics["counts"].items()))
+    if metrics["cache"]:
+        print("  " + ", ".join(f"{k}={v}" for k, v in metrics["cache"].items()))
 
+def run_single(args, pipeline, store=None):
     print(f"{Fore.CYAN}🔎 Fetching article... {Style.RESET_ALL}{args.url}")
-    article = fetch_article(args.url)
-
-    if not article["text"]:
+    try:
+        ctx = pipeline.run(url=args.url)
+    except FetchError as e:
+        print(f"{Fore.RED}❌ {e}{Style.RESET_ALL}")
+        return
+    except EmptyArticleError:
         print(f"{Fore.RED}❌ Failed to extract article text.{Style.RESET_ALL}")
         return
 
-    text = article["text"]
-    title = article["title"]
-    ref_date = article["published_at"] or datetime.now()
-
-    # ✅ Detect list-style articles
-    items = split_list_items(text)
-    if len(items) >= 3:  # treat as bullet/list article
-        print(f"{Fore.YELLOW}📝 Detected List Article → Extracting all points...{Style.RESET_ALL}")
-        events = build_events_from_items(items, ref_date)
+    # ✅ List-style vs normal article
+    if ctx["mode"] == "list":
+        print(f"{Fore.YELLOW}📝 Detected List Article → Extracted all points{Style.RESET_ALL}")
     else:
         print(f"{Fore.GREEN}📘 Normal article detected → Sentence extraction{Style.RESET_ALL}")
-        sentences = split_sentences(text)
-        mentions = extract_date_mentions(text, ref_date)
-        hits = sentences_with_dates(sentences, mentions)
-        events = cluster_events(sentences, hits, window=args.window)
-        for e in events:
-            e["text"] = summarize_event(e["text"])
-            if "year" not in e:
-                e["year"] = None
-
-    # 📌 Fallback when no events parsed
-    if not events:
+    if not ctx["events"]:
         print(f"{Fore.YELLOW}⚠ No events found, adding article headline as event{Style.RESET_ALL}")
-        events = [{
-            "date": article["published_at"],
-            "year": None,
-            "text": summarize_event(title),
-            "surface": "article_header",
-            "anchor_sentence_index": -1
-        }]
-
-    # 🛠 Build final timeline
-    final_timeline = build_timeline(events)
-    rows = to_export_rows(final_timeline)
-
-    result = {
-        "source_title": article["title"],
-        "source_url": article["url"],
-        "reference_date": ref_date.strftime("%Y-%m-%d"),
-        "count": len(rows),
-        "timeline": rows
-    }
+
+    result = ctx["result"]
+    rows = result["timeline"]
 
     save_json(result, args.out)
     if args.csv:
         save_csv(rows, args.csv)
+    if store:
+        store.add_timeline(result)
 
     print(f"{Fore.GREEN}✅ Done! Extracted {len(rows)} timeline events.{Style.RESET_ALL}")
     print(f"💾 Output saved as: {args.out}")
     if args.csv:
         print(f"📄 CSV saved as: {args.csv}")
+    if args.profile:
+        _print_profile(ctx["metrics"])
+
+def run_incremental(args):
+    """Re-poll one article, only processing text that changed since the saved state."""
+    print(f"{Fore.CYAN}🔎 Fetching article... {Style.RESET_ALL}{args.url}")
+    try:
+        article = fetch_article(args.url)
+    except FetchError as e:
+        print(f"{Fore.RED}❌ {e}{Style.RESET_ALL}")
+        return
+    if not article["text"]:
+        print(f"{Fore.RED}❌ Failed to extract article text.{Style.RESET_ALL}")
+        return
+
+    state_path = Path(args.incremental)
+    if state_path.exists():
+        state = IncrementalTimeline.load(str(state_path))
+    else:
+        state = IncrementalTimeline(args.url, article["published_at"], window=args.window)
+    stats = state.update(article["text"])
+    state.save(str(state_path))
+
+    rows = to_export_rows(state.timeline())
+    save_json({
+        "source_title": article["title"],
+        "source_url": article["url"],
+        "reference_date": state.ref_date.strftime("%Y-%m-%d"),
+        "count": len(rows),
+        "timeline": rows
+    }, args.out)
+    print(f"{Fore.GREEN}✅ {stats['new_segments']}/{stats['segments']} segments new, "
+          f"+{stats['new_events']} / -{stats['dropped_events']} events, {len(rows)} total.{Style.RESET_ALL}")
+    print(f"💾 Output saved as: {args.out}")
+
+def _load_batch_articles(path, chunk_size=64):
+    """Yield batch articles; URL inputs without saved text are fetched concurrently."""
+    records = iter_batch_inputs(path)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        to_fetch = [rec["url"] for rec in chunk if not rec["text"] and not rec.get("error")]
+        fetched = {url: (article, error) for url, article, error in fetch_articles(to_fetch)}
+        for rec in chunk:
+            if rec.get("error"):
+                print(f"{Fore.RED}❌ {rec['id']}: {rec['error']}{Style.RESET_ALL}")
+                continue
+            if rec["text"]:
+                article = {"title": rec["title"] or rec["id"], "text": rec["text"],
+                           "published_at": None, "url": rec["url"]}
+            else:
+                article, error = fetched[rec["url"]]
+                if error is not None:
+                    print(f"{Fore.RED}❌ {rec['url']}: {error}{Style.RESET_ALL}")
+                    continue
+            if not article["text"]:
+                print(f"{Fore.RED}❌ No article text: {rec['url'] or rec['id']}{Style.RESET_ALL}")
+                continue
+            article["id"] = rec["id"]
+            yield article
+
+def _batch_outputs(args, store=None, append=False):
+    """
+    Writers for batch results: per-article JSON (or --jsonl), --csv rows and
+    --store. Returns write(article_id, result), checkpoint() (flushes
+    everything and returns {path: size} of the append-only files) and
+    close(), plus the CSV writer for its row count.
+    """
+    # --jsonl streams every result into one file instead of one JSON per article
+    out_dir = Path(args.out_dir)
+    jsonl = JsonlWriter(args.jsonl, append=append) if args.jsonl else None
+    csv_rows = CsvWriter(args.csv, append=append) if args.csv else None
+    if not jsonl:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    stored = []  # results waiting for the next bulk insert into --store
+
+    def write(article_id, result):
+        if jsonl:
+            jsonl.write(dict(result, id=article_id))
+        else:
+            save_json(result, str(out_dir / f"{article_id}.json"))
+        if csv_rows:
+            csv_rows.write_timeline(result)
+        if store:
+            stored.append(dict(result, id=article_id))
+            if len(stored) >= TIMELINE_STORE_BATCH:
+                flush_store()
+
+    def flush_store():
+        store.add_many(stored)
+        stored.clear()
+
+    def checkpoint():
+        if stored:
+            flush_store()
+        return {writer.path: writer.checkpoint() for writer in (jsonl, csv_rows) if writer}
+
+    def close():
+        try:
+            if stored:
+                flush_store()
+        finally:
+            for writer in (jsonl, csv_rows):
+                if writer:
+                    writer.close()
+
+    return write, checkpoint, close, csv_rows
+
+def run_batch(args, pipeline, store=None):
+    write_result, _, close, csv_rows = _batch_outputs(args, store)
+    written = failed = 0
+
+    def write(article, doc=None):
+        # One bad article is reported and skipped; it must not end the batch
+        nonlocal written, failed
+        try:
+            result = pipeline.run(article=article, doc=doc)["result"]
+            write_result(article["id"], result)
+        except Exception as e:
+            failed += 1
+            print(f"{Fore.RED}❌ {article['id']}: {e or type(e).__name__}{Style.RESET_ALL}")
+            return
+        written += 1
+
+    def normal_articles():
+        # List articles are finished here; the rest are streamed to nlp.pipe
+        for article in _load_batch_articles(args.batch):
+            if len(split_list_items(article["text"])) >= LIST_MIN_ITEMS:
+                write(article)
+            else:
+                yield article["text"], article
+
+    try:
+        docs = parse_many(normal_articles(), batch_size=args.batch_size,
+                          n_process=args.n_process, as_tuples=True)
+        for doc, article in docs:
+            write(article, doc)
+    finally:
+        close()
+
+    print(f"{Fore.GREEN}✅ Done! Wrote {written} timelines to {args.jsonl or args.out_dir}{Style.RESET_ALL}")
+    if failed:
+        print(f"{Fore.RED}❌ {failed} articles failed (see above){Style.RESET_ALL}")
+    if csv_rows:
+        print(f"📄 CSV saved as: {args.csv} ({csv_rows.count} rows)")
+    if args.profile:
+        _print_profile(pipeline.snapshot(), label=f"Batch ({written} articles, summed)")
+
+def _print_progress(stats):
+    processed = stats["done"] + stats["failed"] + stats["lost"]
+    eta = f", ETA {stats['eta']:.0f}s" if stats["eta"] is not None else ""
+    print(f"{Fore.CYAN}⏳ {processed}/{stats['total']} articles, {stats['rate']:.1f}/s, "
+          f"{stats['failed'] + stats['lost']} failed{eta}{Style.RESET_ALL}")
+
+def run_sharded(args, pipeline, store=None):
+    """Batch mode across --workers processes, checkpointed to --manifest so reruns resume."""
+    from modules.scheduler import BatchScheduler, read_manifest
+    cache_path = (args.cache or ARTICLE_CACHE_PATH) if (args.cache or args.offline) else None
+
+    def make_fetcher():
+        if cache_path is None:
+            return None
+        return ArticleFetcher(cache=ArticleCache(cache_path), offline=args.offline)
+
+    done, sizes, _ = read_manifest(args.manifest) if args.manifest else ({}, {}, 0)
+    resuming = bool(done)
+    for path in (args.jsonl, args.csv):
+        if resuming and path in sizes:
+            truncate_output(path, sizes[path])  # drop rows written after the last checkpoint
+    write_result, checkpoint, close, csv_rows = _batch_outputs(args, store, append=resuming)
+    warm = pipeline.warmup()  # load the model once; the workers are forked with it
+    print(f"{Fore.CYAN}🚀 {args.workers} workers (model loaded in {warm['model_seconds']:.2f}s)"
+          f"{', resuming ' + args.manifest if resuming else ''}{Style.RESET_ALL}")
+
+    scheduler = BatchScheduler(pipeline, workers=args.workers, make_fetcher=make_fetcher,
+                               timeout=args.article_timeout, max_memory_mb=args.max_memory_mb)
+    try:
+        stats = scheduler.run(iter_batch_inputs(args.batch),
+                              on_result=lambda rec, result: write_result(rec["id"], result),
+                              checkpoint=checkpoint, manifest=args.manifest, retry_failed=args.retry_failed,
+                              progress=_print_progress)
+    except KeyboardInterrupt:
+        print(f"{Fore.YELLOW}⚠ Interrupted; rerun with the same --manifest to resume{Style.RESET_ALL}")
+        return
+    finally:
+        close()
+
+    print(f"{Fore.GREEN}✅ Done! Wrote {stats['done']} timelines to {args.jsonl or args.out_dir} "
+          f"in {stats['elapsed']:.1f}s ({stats['rate']:.1f} articles/s){Style.RESET_ALL}")
+    if stats["skipped"]:
+        print(f"⏭ Skipped {stats['skipped']} articles already in {args.manifest}")
+    if stats["failed"] or stats["lost"]:
+        print(f"{Fore.RED}❌ {stats['failed'] + stats['lost']} articles failed"
+              f"{f' (see {args.manifest})' if args.manifest else ''}{Style.RESET_ALL}")
+    if csv_rows:
+        print(f"📄 CSV saved as: {args.csv} ({csv_rows.count} rows)")
+    if args.profile:
+        _print_profile(pipeline.snapshot(), label=f"Batch ({stats['done']} articles, summed)")
+
+def run_merge(args):
+    """Merge saved per-article timelines into one story timeline with sources."""
+    from modules.timeline_merge import TimelineMerger  # pulls in NumPy
+    merger = TimelineMerger()
+    articles = 0
+    for result in iter_timeline_results(args.merge):
+        merger.add_timeline(result)
+        articles += 1
+    rows = merger.rows()
+
+    save_json({"articles": articles, "count": len(rows), "timeline": rows}, args.out)
+    if args.csv:
+        save_csv([dict(r, sources=" ".join(s["url"] or "" for s in r["sources"])) for r in rows], args.csv)
+    print(f"{Fore.GREEN}✅ Merged {articles} timelines into {len(rows)} events.{Style.RESET_ALL}")
+    print(f"💾 Output saved as: {args.out}")
+
+def run_query(argv):
+    """`main.py query ...`: indexed lookups over the timeline store."""
+    parser = argparse.ArgumentParser(prog="main.py query", description="Query stored timeline events")
+    parser.add_argument("--store", default=TIMELINE_STORE_PATH, help="Timeline store to query")
+    parser.add_argument("--from", dest="start", default=None, help="Earliest date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", default=None, help="Latest date (YYYY-MM-DD)")
+    parser.add_argument("--year", default=None, type=int, help="Events in this year (dated or year-only)")
+    parser.add_argument("--source", default=None, help="Only events from this article URL")
+    parser.add_argument("--phrase", default=None, help="Matched date phrase (case-insensitive)")
+    parser.add_argument("--limit", default=None, type=int, help="Maximum rows")
+    parser.add_argument("--out", default=None, help="Write matching rows as JSONL instead of printing")
+    parser.add_argument("--csv", default=None, help="Write matching rows as CSV")
+    args = parser.parse_args(argv)
+
+    if not Path(args.store).exists():
+        print(f"{Fore.RED}❌ No timeline store at {args.store}; build one with --store{Style.RESET_ALL}")
+        return
+    store = TimelineStore(args.store)
+    rows = store.query(start=args.start, end=args.end, year=args.year, source_url=args.source,
+                       phrase=args.phrase, limit=args.limit)
+    writers = [w for w in (args.out and JsonlWriter(args.out), args.csv and CsvWriter(args.csv)) if w]
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            for w in writers:
+                w.write(row)
+            if not writers:
+                source = row["source_url"] or row["source_title"]
+                print(f"{row['date'] or row['year'] or '-':<10}  {row['event']}  {Fore.CYAN}{source}{Style.RESET_ALL}")
+    finally:
+        for w in writers:
+            w.close()
+        store.close()
+    print(f"{Fore.GREEN}✅ {count} matching events.{Style.RESET_ALL}")
+
+def main():
+    if sys.argv[1:2] == ["query"]:
+        return run_query(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="Timeline Extractor - TOI compatible version (no AI)")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--url", help="News article URL")
+    src.add_argument("--batch", help="File of URLs, JSONL of url/text records, or a directory of .txt articles")
+    src.add_argument("--merge", help="Directory of timeline JSON files (or JSONL) to merge into one story timeline")
+    parser.add_argument("--window", default=EVENT_WINDOW, type=int, help="Context lines to include")
+    parser.add_argument("--top-k", default=EVENT_TOP_K, type=int,
+                        help="Keep the best K events per date/year (0 = all)")
+    parser.add_argument("--event-budget", default=EVENT_BUDGET, type=int,
+                        help="Keep at most this many events per article (0 = no limit)")
+    parser.add_argument("--out", default="timeline.json", help="Output JSON file")
+    parser.add_argument("--csv", default=None, help="Optional CSV export path (batch: streamed rows, .gz compresses)")
+    parser.add_argument("--out-dir", default="timelines", help="Batch mode: directory for per-article JSON")
+    parser.add_argument("--jsonl", default=None,
+                        help="Batch mode: stream all timelines to one JSONL file instead (.gz compresses)")
+    parser.add_argument("--batch-size", default=SPACY_BATCH_SIZE, type=int, help="Batch mode: docs per nlp.pipe batch")
+    parser.add_argument("--n-process", default=SPACY_N_PROCESS, type=int, help="Batch mode: spaCy worker processes")
+    parser.add_argument("--workers", default=0, type=int,
+                        help="Batch mode: run the whole pipeline in N forked worker processes")
+    parser.add_argument("--manifest", default=None,
+                        help="With --workers: checkpoint finished articles here and skip them on rerun")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="With --manifest: rerun articles that failed or timed out last time")
+    parser.add_argument("--article-timeout", default=SCHED_ARTICLE_TIMEOUT, type=int,
+                        help="With --workers: seconds allowed per article, fetch included")
+    parser.add_argument("--max-memory-mb", default=SCHED_MAX_MEMORY_MB, type=int,
+                        help="With --workers: memory each worker may grow by beyond the loaded model (0 = no cap)")
+    parser.add_argument("--nlp-profile", default=SPACY_PROFILE, choices=sorted(SPACY_PROFILES),
+                        help="spaCy components to run (see settings.SPACY_PROFILES)")
+    parser.add_argument("--cache", nargs="?", const=ARTICLE_CACHE_PATH, default=None,
+                        help=f"Cache fetched pages and extracted articles (default path: {ARTICLE_CACHE_PATH})")
+    parser.add_argument("--offline", action="store_true", help="Replay from the article cache only, no network")
+    parser.add_argument("--incremental", metavar="STATE", default=None,
+                        help="With --url: keep per-article state here and only process new or changed text")
+    parser.add_argument("--store", nargs="?", const=TIMELINE_STORE_PATH, default=None,
+                        help=f"Also add timelines to the queryable store (default path: {TIMELINE_STORE_PATH})")
+    parser.add_argument("--profile", action="store_true", help="Print per-stage timings, counts and cache hits")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Load the model and prime regex/date caches first, and report the cold-start cost")
+    args = parser.parse_args()
+    if not (args.url or args.batch or args.merge or args.warmup):
+        parser.error("one of the arguments --url --batch --merge is required")
+    if args.manifest and not (args.batch and args.workers):
+        parser.error("--manifest needs --batch with --workers")
+    if (args.top_k or args.event_budget) and args.nlp_profile == "lean":
+        args.nlp_profile = "rank"  # ranking reads POS tags, so keep the tagger
+    set_profile(args.nlp_profile)
+
+    fetcher = None
+    if args.cache or args.offline:
+        cache = ArticleCache(args.cache or ARTICLE_CACHE_PATH)
+        fetcher = ArticleFetcher(cache=cache, offline=args.offline)
+        set_fetcher(fetcher)
+    pipeline = TimelinePipeline(window=args.window, fetcher=fetcher,
+                                top_k=args.top_k, budget=args.event_budget)
+    store = TimelineStore(args.store) if args.store else None
+
+    if args.warmup:
+        warm = pipeline.warmup()
+        print(f"{Fore.CYAN}🔥 Warmed up: model {warm['model_seconds']:.2f}s, "
+              f"first run {warm['pipeline_seconds']:.2f}s{Style.RESET_ALL}")
+    try:
+        if args.merge:
+            run_merge(args)
+        elif args.batch and args.workers:
+            run_sharded(args, pipeline, store)
+        elif args.batch:
+            run_batch(args, pipeline, store)
+        elif args.incremental:
+            run_incremental(args)
+        elif args.url:
+            run_single(args, pipeline, store)
+    finally:
+        if fetcher:
+            fetcher.close()
+        if store:
+            store.close()
 
 if __name__ == "__main__":
     main()
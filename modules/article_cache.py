@@ -0,0 +1,157 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path
+from .settings import ARTICLE_CACHE_PATH, ARTICLE_CACHE_TTL, ARTICLE_CACHE_MAX_AGE, ARTICLE_CACHE_MAX_BYTES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    content_hash  TEXT NOT NULL,
+    html          BLOB NOT NULL,
+    encoding      TEXT,
+    status        INTEGER,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    size          INTEGER NOT NULL,
+    article       TEXT,
+    article_hash  TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+CREATE INDEX IF NOT EXISTS pages_fetched ON pages (fetched_at);
+"""
+
+EVICT_EVERY = 200  # puts between eviction passes
+
+def content_hash(content: bytes) -> str:
+    return sha256(content).hexdigest()
+
+def _encode_article(article: dict) -> str:
+    published = article.get("published_at")
+    return json.dumps({
+        "title": article.get("title"),
+        "text": article.get("text"),
+        "published_at": published.isoformat() if published else None,
+    }, ensure_ascii=False)
+
+def _decode_article(raw: str, url: str) -> dict:
+    data = json.loads(raw)
+    published = data["published_at"]
+    return {
+        "title": data["title"],
+        "text": data["text"],
+        "published_at": datetime.fromisoformat(published) if published else None,
+        "url": url,
+    }
+
+class ArticleCache:
+    """
+    SQLite cache of fetched pages, keyed by URL and content hash.
+
+    Stores the zlib-compressed raw HTML with its HTTP validators, plus the
+    extracted {title, text, published_at} for that exact content, so a
+    re-run skips both the download and the HTML parsing.
+    """
+
+    def __init__(self, path=ARTICLE_CACHE_PATH, ttl=ARTICLE_CACHE_TTL,
+                 max_age=ARTICLE_CACHE_MAX_AGE, max_bytes=ARTICLE_CACHE_MAX_BYTES):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = {"page_hits": 0, "page_misses": 0, "article_hits": 0, "article_misses": 0}
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def is_fresh(self, page: dict) -> bool:
+        return time.time() - page["fetched_at"] < self.ttl
+
+    def get_page(self, url: str):
+        """Cached page dict (same shape as ArticleFetcher pages) or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, html, encoding, status, etag, last_modified, fetched_at "
+                "FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.stats["page_misses"] += 1
+                return None
+            self.stats["page_hits"] += 1
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        digest, html, encoding, status, etag, last_modified, fetched_at = row
+        return {"url": url, "status": status, "content": zlib.decompress(html), "encoding": encoding,
+                "etag": etag, "last_modified": last_modified, "from_cache": True,
+                "content_hash": digest, "fetched_at": fetched_at}
+
+    def put_page(self, page: dict):
+        """Store a freshly fetched page; a changed content hash drops the stored article. Only 2xx pages are kept."""
+        if not 200 <= (page["status"] or 0) < 300:
+            return
+        html = zlib.compress(page["content"])
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pages (url, content_hash, html, encoding, status, etag, last_modified, "
+                "fetched_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "article = CASE WHEN content_hash = excluded.content_hash THEN article END, "
+                "article_hash = CASE WHEN content_hash = excluded.content_hash THEN article_hash END, "
+                "content_hash = excluded.content_hash, html = excluded.html, encoding = excluded.encoding, "
+                "status = excluded.status, etag = excluded.etag, last_modified = excluded.last_modified, "
+                "fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at, size = excluded.size",
+                (page["url"], page["content_hash"], html, page["encoding"], page["status"],
+                 page["etag"], page["last_modified"], now, now, len(html)))
+            self._db.commit()
+            self._puts += 1
+            due = self._puts % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def touch(self, url: str):
+        """Mark a page as revalidated (HTTP 304) so its TTL starts over."""
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def get_article(self, url: str, digest: str):
+        """Extracted article for exactly this content, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT article FROM pages WHERE url = ? AND article_hash = ?",
+                                   (url, digest)).fetchone()
+            self.stats["article_hits" if row and row[0] else "article_misses"] += 1
+        return _decode_article(row[0], url) if row and row[0] else None
+
+    def put_article(self, url: str, digest: str, article: dict):
+        with self._lock:
+            self._db.execute("UPDATE pages SET article = ?, article_hash = ? WHERE url = ? AND content_hash = ?",
+                             (_encode_article(article), digest, url, digest))
+            self._db.commit()
+
+    def evict(self):
+        """Drop entries past max_age, then least recently used ones until under max_bytes."""
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total > self.max_bytes:
+                over = total - self.max_bytes
+                for url, size in self._db.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+                    if over <= 0:
+                        break
+                    self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+                    over -= size
+            self._db.commit()
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._db.close()
@@ -1,12 +1,11 @@
-import re
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from dateutil import parser as dateparser
-from dateutil.relativedelta import relativedelta
-import spacy
-from .date_patterns import DATE_MASTER_REGEX, RELATIVE_PATTERNS, RANGE_PATTERNS
-from .settings import REF_YEAR_TOLERANCE_FUTURE
-
-nlp = spacy.load("en_core_web_sm")
+from functools import lru_cache
+from .date_patterns import (
+    RELATIVE_PATTERNS, MONTH_NUMBERS, WEEKDAY_NUMBERS, DATE_SCANNER, YEAR_RE, PLAIN_YEAR_RE
+)
+from .settings import REF_YEAR_TOLERANCE_FUTURE, NER_MIN_REGEX_DATES, DATE_CACHE_SIZE
+from .nlp_models import parse_article, apply_ner
 
 # Ignore useless date-like junk
 JUNK_PATTERNS = [
@@ -15,78 +14,214 @@ JUNK_PATTERNS = [
     r"^\d+\s*days?$",
 ]
 
-# Capture YEAR separately
-YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
-
 def find_years(text: str, ref_date: datetime):
-    years = []
-    for m in YEAR_RE.findall(text or ""):
-        y = int(m)
-        if 1900 <= y <= (ref_date.year + REF_YEAR_TOLERANCE_FUTURE):
-            if y not in years:
-                years.append(y)
+    """Distinct plausible years in `text`, in order of appearance."""
+    years, seen = [], set()
+    max_year = ref_date.year + REF_YEAR_TOLERANCE_FUTURE
+    for m in YEAR_RE.finditer(text or ""):
+        y = int(m.group(0))
+        if y <= max_year and y not in seen:
+            seen.add(y)
+            years.append(y)
     return years
 
-def normalize_absolute_date(text: str, dayfirst=True):
-    # Skip pure year-only here (years handled separately)
-    if re.fullmatch(r"(19|20)\d{2}", text.strip()):
+_fast_path_parses = 0
+
+def _month(name: str) -> int:
+    return MONTH_NUMBERS[name[:3].lower()]
+
+# ----- DATE_SCANNER tokens -> datetimes (built from the groups, no re-parsing) -----
+
+def _range_dates(m, ref_date):
+    year = int(m["r_y"]) if m["r_y"] else ref_date.year
+    return [datetime(year, _month(m["r_m1"]), int(m["r_d1"])),
+            datetime(year, _month(m["r_m2"]), int(m["r_d2"]))]
+
+def _day_range_dates(m, ref_date):
+    year = int(m["dr_y"]) if m["dr_y"] else ref_date.year
+    month = _month(m["dr_m"])
+    return [datetime(year, month, int(m["dr_d1"])), datetime(year, month, int(m["dr_d2"]))]
+
+RELATIVE_OFFSETS = dict(RELATIVE_PATTERNS)
+
+def _day(ref_date: datetime) -> datetime:
+    return ref_date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def resolve_relative(phrase: str, ref_date: datetime) -> datetime:
+    """Date for one RELATIVE_PATTERNS phrase (any case/spacing) relative to `ref_date`."""
+    unit, value = RELATIVE_OFFSETS[" ".join(phrase.lower().split())]
+    day = _day(ref_date)
+    if unit == "days":    return day + timedelta(days=value)
+    if unit == "weeks":   return day + timedelta(weeks=value)
+    from dateutil.relativedelta import relativedelta
+    if unit == "months":  return day + relativedelta(months=value)
+    return day + relativedelta(years=value)
+
+def resolve_weekday(rel: str, weekday: str, ref_date: datetime) -> datetime:
+    """
+    "on Tuesday" (or a bare "Tuesday") is the latest Tuesday on or before
+    `ref_date` (news reports past events), "last Tuesday" the latest strictly before,
+    "next Tuesday" the first strictly after, and "this Tuesday" the
+    Tuesday of ref_date's Monday-to-Sunday week.
+    """
+    day = _day(ref_date)
+    target = WEEKDAY_NUMBERS[weekday.lower()]
+    rel = rel.lower()
+    if rel == "next":
+        return day + timedelta(days=(target - day.weekday()) % 7 or 7)
+    if rel == "this":
+        return day + timedelta(days=target - day.weekday())
+    back = (day.weekday() - target) % 7
+    if rel == "last":
+        back = back or 7
+    return day - timedelta(days=back)
+
+TOKEN_DATES = {
+    "range": _range_dates,
+    "day_range": _day_range_dates,
+    "mdy": lambda m, ref: [datetime(int(m["mdy_y"]), _month(m["mdy_m"]), int(m["mdy_d"]))],
+    "dmy": lambda m, ref: [datetime(int(m["dmy_y"]), _month(m["dmy_m"]), int(m["dmy_d"]))],
+    "iso": lambda m, ref: [datetime(int(m["iso_y"]), int(m["iso_m"]), int(m["iso_d"]))],
+    "month_year": lambda m, ref: [datetime(int(m["my_y"]), _month(m["my_m"]), 1)],
+    "quarter": lambda m, ref: [datetime(int(m["q_y"]), 3 * int(m["q_n"]) - 2, 1)],
+    "relative": lambda m, ref: [resolve_relative(m["rel"], ref)],
+    "weekday": lambda m, ref: [resolve_weekday(m["wd_rel"] or "on", m["wd_day"], ref)],
+}
+
+# Tokens that need the article's reference date (or stand for more than one date)
+REF_KINDS = ("range", "day_range", "relative", "weekday")
+
+def token_dates(m, ref_date: datetime):
+    """Dates for one DATE_SCANNER match; [] if the date is invalid (e.g. Feb 30)."""
+    try:
+        return TOKEN_DATES[m.lastgroup](m, ref_date)
+    except ValueError:
+        return []
+
+def _parse_known_shape(text: str):
+    """
+    Parse the exact single-date scanner shapes directly.
+    Returns None if `text` is not one of them, False if it is but the date is invalid.
+    """
+    m = DATE_SCANNER.fullmatch(text)
+    if m is None or m.lastgroup in REF_KINDS:
         return None
+    dates = token_dates(m, None)
+    return dates[0] if dates else False
+
+_NEEDS_REF = object()  # the surface is not a fully specified scanner shape
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _normalize_cached(text: str, dayfirst: bool, default):
+    """
+    With `default` None only the fully specified scanner shapes are parsed
+    (their key does not depend on the article); anything else returns
+    _NEEDS_REF. Otherwise dateutil fills missing fields from `default`.
+    """
+    global _fast_path_parses
+    if default is None:
+        dt = _parse_known_shape(text)
+        if dt is None:
+            return _NEEDS_REF
+        _fast_path_parses += 1
+        return dt or None
     try:
-        return dateparser.parse(text.strip(), dayfirst=dayfirst, fuzzy=True)
+        from dateutil import parser as dateparser  # only shapes the scanner does not know get here
+        return dateparser.parse(text, dayfirst=dayfirst, fuzzy=True, default=default)
     except Exception:
         return None
 
+def normalize_absolute_date(text: str, dayfirst=True, ref_date: datetime = None):
+    """Date for one absolute date surface; missing year/month/day come from `ref_date` (default: today)."""
+    # Skip pure year-only here (years handled separately)
+    text = text.strip()
+    if PLAIN_YEAR_RE.fullmatch(text):
+        return None
+    dt = _normalize_cached(text, dayfirst, None)
+    if dt is _NEEDS_REF:
+        dt = _normalize_cached(text, dayfirst, _day(ref_date or datetime.now()).replace(tzinfo=None))
+    return dt
+
+def date_cache_stats():
+    """Hit/miss counters of the date normalization cache."""
+    info = _normalize_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize,
+            "maxsize": info.maxsize, "fast_path": _fast_path_parses}
+
+def clear_date_cache():
+    global _fast_path_parses
+    _normalize_cached.cache_clear()
+    _fast_path_parses = 0
+
 def normalize_relative_phrase(text: str, ref_date: datetime):
-    t = text.lower()
-    for phrase, (unit, value) in RELATIVE_PATTERNS:
-        if phrase in t:
-            if unit == "days":    return ref_date + timedelta(days=value)
-            if unit == "weeks":   return ref_date + timedelta(weeks=value)
-            if unit == "months":  return ref_date + relativedelta(months=value)
-            if unit == "years":   return ref_date + relativedelta(years=value)
+    """Date for the first relative phrase or weekday reference in `text`, or None."""
+    for m in DATE_SCANNER.finditer(text):
+        if m.lastgroup in ("relative", "weekday"):
+            return token_dates(m, ref_date)[0]
     return None
 
-def extract_date_mentions(text: str, ref_date: datetime):
+def extract_date_mentions(text: str, ref_date: datetime, doc=None):
+    """Collect date mentions; pass the article `doc` to reuse an existing parse."""
+    return dedupe_mentions(scan_date_mentions(text, ref_date, doc))
+
+def scan_date_mentions(text: str, ref_date: datetime, doc=None):
+    """
+    Raw (not deduped) date mentions: one DATE_SCANNER sweep in text order,
+    then NER dates that do not overlap a scanned span. Ranges, relative
+    phrases and weekdays are resolved against `ref_date`.
+    Each mention carries its kind and the character span of its match in `text`.
+    """
     mentions = []
+    starts, ends = [], []
+    resolved = {}  # per-article table: a repeated phrase ("yesterday") is resolved once
 
-    # ----- Extract Date Ranges -----
-    for rx in RANGE_PATTERNS:
-        for m in rx.finditer(text):
-            parts = m.groups()
-            if len(parts) == 5:  # month1 day1 to month2 day2, year
-                m1, d1, m2, d2, y = parts
-                year = int(y) if y else ref_date.year
-            else:
-                continue
-            try:
-                dt1 = dateparser.parse(f"{d1} {m1} {year}")
-                dt2 = dateparser.parse(f"{d2} {m2} {year}")
-                mentions.append({"surface": m.group(0), "normalized": dt1})
-                mentions.append({"surface": m.group(0), "normalized": dt2})
-            except:
-                pass
-
-    # ----- Extract direct date formats -----
-    for m in DATE_MASTER_REGEX.finditer(text):
-        date_str = next(g for g in m.groups() if g)
-        if re.fullmatch(r"(19|20)\d{2}", date_str): # skip plain year
-            continue
-        dt = normalize_absolute_date(date_str)
-        if dt:
-            mentions.append({"surface": date_str, "normalized": dt})
+    # ----- One pass over the text: ranges, direct formats, relative phrases -----
+    for m in DATE_SCANNER.finditer(text):
+        start, end = m.span()
+        starts.append(start)
+        ends.append(end)
+        surface = m.group(0)
+        key = surface.lower()
+        dates = resolved.get(key)
+        if dates is None:
+            dates = resolved[key] = token_dates(m, ref_date)
+        kind = m.lastgroup
+        for dt in dates:
+            mentions.append({"surface": surface, "normalized": dt, "start": start, "end": end, "kind": kind})
 
     # ----- Extract via SpaCy NER -----
-    doc = nlp(text)
+    if doc is None:
+        doc = parse_article(text)
+    if not doc.has_annotation("ENT_IOB"):
+        # Parsed without NER (regex profile): only run it when regex came up short
+        if len(mentions) >= NER_MIN_REGEX_DATES:
+            return mentions
+        doc = apply_ner(doc)
     for ent in doc.ents:
-        if ent.label_ == "DATE":
-            s = ent.text.strip()
-            if re.fullmatch(r"(19|20)\d{2}", s):  # skip plain year
-                continue
-            dt = normalize_absolute_date(s)
+        if ent.label_ != "DATE":
+            continue
+        s = ent.text.strip()
+        if PLAIN_YEAR_RE.fullmatch(s):  # skip plain year
+            continue
+        start = ent.start_char + (len(ent.text) - len(ent.text.lstrip()))
+        end = start + len(s)
+        # Scanned spans take precedence over overlapping entities
+        k = bisect_right(starts, start) - 1
+        if (k >= 0 and ends[k] > start) or (k + 1 < len(starts) and starts[k + 1] < end):
+            continue
+        m = DATE_SCANNER.fullmatch(s)
+        if m and m.lastgroup in REF_KINDS:  # "Tuesday": resolve as the scanner does, not with dateutil
+            dates = token_dates(m, ref_date)
+        else:
+            dates = [normalize_absolute_date(s, ref_date=ref_date)]
+        for dt in dates:
             if dt:
-                mentions.append({"surface": s, "normalized": dt})
+                mentions.append({"surface": s, "normalized": dt, "start": start, "end": end, "kind": "ner"})
+
+    return mentions
 
-    # Dedupe results
+def dedupe_mentions(mentions):
+    """Dedupe results by surface + calendar date, keeping the first occurrence."""
     final = []
     seen = set()
     for m in mentions:
@@ -21,6 +21,18 @@ DATE_REGEXPS = [
 # Join into one mega regex
 DATE_MASTER_REGEX = re.compile("|".join(f"({r})" for r in DATE_REGEXPS), re.IGNORECASE)
 
+MONTH_NUMBERS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+# Four-digit years 1900-2099
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+PLAIN_YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+
+# Weekday names, bare or in "on/last/next/this <weekday>"
+WEEKDAYS = r"(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)"
+WEEKDAY_NUMBERS = {d: i for i, d in enumerate(
+    ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"])}
+
 # Relative date patterns
 RELATIVE_PATTERNS = [
     ("yesterday", ("days", -1)),
@@ -50,3 +62,30 @@ RANGE_PATTERNS = [
         flags=re.IGNORECASE,
     ),
 ]
+
+RELATIVE_ALTERNATION = "|".join(phrase.replace(" ", r"\s+") for phrase, _ in RELATIVE_PATTERNS)
+
+# One-pass scanner: every shape in this file as a named alternative, tried
+# in this order at each position, so a range wins over the dates inside it
+# and matches never overlap. m.lastgroup is the kind of the token. The leading
+# word boundary + first-character lookahead rejects most positions before
+# any alternative is tried.
+SCAN_PATTERNS = [
+    ("range", rf"\b(?P<r_m1>{MONTHS})\s+(?P<r_d1>\d{{1,2}})\s+(?:to|-|–|—)\s+"
+              rf"(?P<r_m2>{MONTHS})\s+(?P<r_d2>\d{{1,2}})(?:,\s*(?P<r_y>\d{{4}}))?\b"),
+    ("day_range", rf"\b(?P<dr_m>{MONTHS})\s+(?P<dr_d1>\d{{1,2}})\s*(?:to|-|–|—)\s*"
+                  rf"(?P<dr_d2>\d{{1,2}})(?:,\s*(?P<dr_y>\d{{4}}))?\b"),
+    ("mdy", rf"\b(?P<mdy_m>{MONTHS})\s+(?P<mdy_d>\d{{1,2}})(?:st|nd|rd|th)?(?:,)?\s+(?P<mdy_y>\d{{4}})\b"),
+    ("dmy", rf"\b(?P<dmy_d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<dmy_m>{MONTHS})\s+(?P<dmy_y>\d{{4}})\b"),
+    ("iso", r"\b(?P<iso_y>\d{4})[-/](?P<iso_m>\d{1,2})[-/](?P<iso_d>\d{1,2})\b"),
+    ("month_year", rf"\b(?P<my_m>{MONTHS})\s+(?P<my_y>\d{{4}})\b"),
+    ("quarter", r"\bQ(?P<q_n>[1-4])[- ]?(?P<q_y>\d{4})\b"),
+    ("relative", rf"\b(?P<rel>{RELATIVE_ALTERNATION})\b"),
+    # "on Tuesday" or a bare "said Tuesday", but not "on Tuesday, March 5, 2024"
+    # (the absolute date is matched next)
+    ("weekday", rf"\b(?:(?P<wd_rel>on|last|next|this)\s+)?(?P<wd_day>{WEEKDAYS})\b(?!,?\s+(?:{MONTHS}\b|\d))"),
+]
+DATE_SCANNER = re.compile(
+    r"\b(?=[JFMASONDQTYLW\d])(?:" + "|".join(f"(?P<{kind}>{rx})" for kind, rx in SCAN_PATTERNS) + ")",
+    re.IGNORECASE,
+)
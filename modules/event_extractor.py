@@ -1,26 +1,18 @@
 import re
-import spacy
+from bisect import bisect_right
 from typing import List, Dict, Tuple
-from .settings import (
-    IGNORE_IF_CONTAINS, DROP_SENTENCE_IF_MATCHES, MIN_EVENT_LEN_CHARS,
-    HEADLINE_MAX_LEN, HEADLINE_MIN_WORDS, PROXIMITY_WINDOW
-)
+from .settings import HEADLINE_MAX_LEN, HEADLINE_MIN_WORDS, PROXIMITY_WINDOW
+from .nlp_models import parse_article
+from .text_rules import get_rules
+from .event_record import EventRecord
 
-nlp = spacy.load("en_core_web_sm")
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
 
 def _keep_sentence(s: str) -> bool:
     """Filter out junk sentences."""
-    low = s.lower()
-    if any(bad in low for bad in IGNORE_IF_CONTAINS):
-        return False
-    for pattern in DROP_SENTENCE_IF_MATCHES:
-        if re.fullmatch(pattern, s.strip(), flags=re.I):
-            return False
-    if len(s) < MIN_EVENT_LEN_CHARS:  # too small content
-        return False
-    return True
+    return get_rules().keep(s)
 
-def _is_headline_like(s: str) -> bool:
+def is_headline_like(s: str) -> bool:
     """Identify lines that look like headlines for event clustering."""
     if len(s) > HEADLINE_MAX_LEN:
         return False
@@ -31,18 +23,52 @@ def _is_headline_like(s: str) -> bool:
     if s.count(".") > 1:
         return False
     # Check capitalization like titles
-    words = re.findall(r"[A-Za-z][A-Za-z'-]*", s)
+    words = WORD_RE.findall(s)
     if not words:
         return False
     capitalized = sum(1 for w in words if w[0].isupper())
     return capitalized / len(words) > 0.5
 
-def split_sentences(text: str) -> List[str]:
-    doc = nlp(text)
-    sentences = [s.text.strip() for s in doc.sents]
-    return [s for s in sentences if _keep_sentence(s)]
+def split_sentence_spans(text: str, doc=None) -> List[Tuple[str, int, int]]:
+    """Kept sentences with their (start, end) character offsets in `text`."""
+    if doc is None:
+        doc = parse_article(text)
+    sents = list(doc.sents)
+    stripped = [s.text.strip() for s in sents]
+    spans = []
+    for s, sent, keep in zip(sents, stripped, get_rules().keep_many(stripped)):
+        if keep:
+            raw = s.text
+            start = s.start_char + (len(raw) - len(raw.lstrip()))
+            spans.append((sent, start, start + len(sent)))
+    return spans
 
-def sentences_with_dates(sentences: List[str], date_mentions: List[Dict]) -> List[Tuple[str, object, int]]:
+def split_sentences(text: str, doc=None) -> List[str]:
+    """Split text into kept sentences; pass the article `doc` to reuse an existing parse."""
+    return [s for s, _, _ in split_sentence_spans(text, doc)]
+
+def _hits_by_offset(offsets, date_mentions):
+    """Sorted interval join: each mention goes to the kept sentence containing its start."""
+    starts = [a for a, _ in offsets]
+    rank = {}
+    found = {}
+    for m in date_mentions:
+        r = rank.setdefault((m["surface"], m["normalized"].date()), len(rank))
+        i = bisect_right(starts, m["start"]) - 1
+        if i < 0 or m["start"] >= offsets[i][1]:  # falls in a dropped sentence
+            continue
+        found.setdefault((i, r), (m["surface"], m["normalized"], i))
+    return [found[k] for k in sorted(found)]
+
+def sentences_with_dates(sentences: List[str], date_mentions: List[Dict], offsets=None) -> List[Tuple[str, object, int]]:
+    """
+    Pair sentences with the date mentions they contain.
+    With sentence `offsets` (from split_sentence_spans) and raw mentions
+    (from scan_date_mentions) this is an offset join; otherwise it falls
+    back to substring search on the mention surfaces.
+    """
+    if offsets is not None:
+        return _hits_by_offset(offsets, date_mentions)
     hits = []
     for i, sent in enumerate(sentences):
         low = sent.lower()
@@ -51,34 +77,48 @@ def sentences_with_dates(sentences: List[str], date_mentions: List[Dict]) -> Lis
                 hits.append((m["surface"], m["normalized"], i))
     return hits
 
+def _nearest_anchor(anchors, first_pos, i):
+    """Closest dated sentence to `i`; ties go to the anchor seen first in hits."""
+    k = bisect_right(anchors, i)
+    best = None
+    for j in (k - 1, k):
+        if 0 <= j < len(anchors):
+            a = anchors[j]
+            cand = (abs(a - i), first_pos[a])
+            if best is None or cand < best[0]:
+                best = (cand, a)
+    return best[1] if best else None
+
 def _pair_headlines(sentences, hits):
-    idx_to_dates = {}
-    for surf, dt, idx in hits:
-        idx_to_dates.setdefault(idx, []).append((surf, dt))
-    new_hits = hits[:]
+    first_pos = {}
+    for pos, (_, _, idx) in enumerate(hits):
+        first_pos.setdefault(idx, pos)
+    anchors = sorted(first_pos)
+    new_hits = list(hits)
     for i, sent in enumerate(sentences):
-        if _is_headline_like(sent) and i not in idx_to_dates:
-            closest = sorted(hits, key=lambda h: abs(h[2] - i))
-            if closest:
-                new_hits.append((closest[0][0], closest[0][1], i))
+        if i not in first_pos and is_headline_like(sent):
+            a = _nearest_anchor(anchors, first_pos, i)
+            if a is not None:
+                surf, dt, _ = hits[first_pos[a]]
+                new_hits.append((surf, dt, i))
     return new_hits
 
 def cluster_events(sentences: List[str], hits, window=0):
     hits = _pair_headlines(sentences, hits)
     events = []
     seen = set()
+    emitted_windows = set()
     for surf, dt, i in hits:
         start = max(i - window, 0)
         end = min(i + window + 1, len(sentences))
-        chunk = " ".join(sentences[start:end])
-        key = (dt.date() if dt else None, chunk[:50])
+        day = dt.date() if dt else None
+        if (day, start, end) in emitted_windows:  # same chunk, same key: already handled
+            continue
+        emitted_windows.add((day, start, end))
+        event = EventRecord(dt, surf, anchor=i, sentences=sentences, start=start, end=end)
+        key = (day, event.text_prefix(50))
         if key in seen:
             continue
-        events.append({
-            "date": dt,
-            "text": chunk,
-            "surface": surf,
-            "anchor_sentence_index": i
-        })
+        events.append(event)
         seen.add(key)
     return events
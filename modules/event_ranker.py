@@ -0,0 +1,103 @@
+import numpy as np
+from typing import Dict, List
+from spacy.attrs import IDX, POS
+from spacy.parts_of_speech import VERB, PROPN
+from .event_extractor import is_headline_like
+from .settings import (
+    SCORE_HEADLINE_BONUS, SCORE_VERB_WEIGHT, SCORE_PROPN_WEIGHT, SCORE_LEN_CAP, SCORE_LEN_UNIT
+)
+
+def _char_bounds(events, spans):
+    """Character range covered by each event's sentence window."""
+    starts = np.fromiter((spans[e["sentence_start"]][1] for e in events), dtype=np.int64, count=len(events))
+    ends = np.fromiter((spans[e["sentence_end"] - 1][2] for e in events), dtype=np.int64, count=len(events))
+    return starts, ends
+
+def score_events(events: List[Dict], spans, doc) -> np.ndarray:
+    """
+    Score every candidate at once from the article Doc's token arrays:
+    headline bonus + weighted log counts of verbs and proper nouns +
+    capped length. Without POS tags (tagger disabled), capitalized
+    tokens that do not start a sentence stand in for proper nouns.
+    """
+    idx = doc.to_array(IDX).astype(np.int64)
+    if doc.has_annotation("POS"):
+        pos = doc.to_array(POS)
+        verb, propn = pos == VERB, pos == PROPN
+    else:
+        verb = np.zeros(len(doc), dtype=bool)
+        propn = np.fromiter((t.is_title and not t.is_sent_start for t in doc), dtype=bool, count=len(doc))
+    verb_cum = np.concatenate(([0], np.cumsum(verb)))
+    propn_cum = np.concatenate(([0], np.cumsum(propn)))
+
+    starts, ends = _char_bounds(events, spans)
+    t0 = np.searchsorted(idx, starts, side="left")
+    t1 = np.searchsorted(idx, ends, side="left")
+    n_tokens = t1 - t0
+    verbs = verb_cum[t1] - verb_cum[t0]
+    propns = propn_cum[t1] - propn_cum[t0]
+
+    sentences = [spans[e["anchor_sentence_index"]][0] for e in events]
+    headline = np.fromiter((is_headline_like(s) for s in sentences), dtype=bool, count=len(events))
+    return (SCORE_HEADLINE_BONUS * headline
+            + SCORE_VERB_WEIGHT * np.log1p(verbs)
+            + SCORE_PROPN_WEIGHT * np.log1p(propns)
+            + np.minimum(n_tokens / SCORE_LEN_UNIT, SCORE_LEN_CAP))
+
+def score_items(events: List[Dict]) -> np.ndarray:
+    """
+    Scores for list-mode events, which have no Doc: the same terms as
+    score_events without POS tags, counted on each item's text.
+    """
+    words = [e["text"].split() for e in events]
+    n = len(events)
+    propns = np.fromiter((sum(w.istitle() for w in ws[1:]) for ws in words), dtype=np.int64, count=n)
+    n_tokens = np.fromiter((len(ws) for ws in words), dtype=np.int64, count=n)
+    headline = np.fromiter((is_headline_like(e["text"]) for e in events), dtype=bool, count=n)
+    return (SCORE_HEADLINE_BONUS * headline
+            + SCORE_PROPN_WEIGHT * np.log1p(propns)
+            + np.minimum(n_tokens / SCORE_LEN_UNIT, SCORE_LEN_CAP))
+
+def _bucket(e):
+    if e.get("date"):
+        return e["date"].date()
+    return e.get("year")
+
+def select_top(scores: np.ndarray, buckets: List, top_k=0, budget=0) -> np.ndarray:
+    """Indices to keep: the best `top_k` per bucket, then the best `budget` overall, in input order."""
+    n = len(scores)
+    keep = np.ones(n, dtype=bool)
+    if top_k:
+        ids = {}
+        bucket_ids = np.fromiter((ids.setdefault(b, len(ids)) for b in buckets), dtype=np.int64, count=n)
+        order = np.lexsort((np.arange(n), -scores, bucket_ids))  # by bucket, best first, stable
+        sorted_ids = bucket_ids[order]
+        first = np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1]))
+        group_start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n) - group_start
+        keep &= rank < top_k
+    if budget and keep.sum() > budget:
+        candidates = np.flatnonzero(keep)
+        best = candidates[np.argsort(-scores[candidates], kind="stable")[:budget]]
+        keep[:] = False
+        keep[best] = True
+    return np.flatnonzero(keep)
+
+def rank_events(events: List[Dict], spans=None, doc=None, top_k=0, budget=0) -> List[Dict]:
+    """
+    Keep the highest scoring clustered events: `top_k` per date (or year)
+    bucket and at most `budget` per article. Kept events get a "score" and
+    stay in their original order. Without a `doc` (list mode) events are
+    scored on their text with score_items.
+    """
+    if not events or not (top_k or budget):
+        return events
+    scores = score_events(events, spans, doc) if doc is not None else score_items(events)
+    kept = select_top(scores, [_bucket(e) for e in events], top_k, budget)
+    out = []
+    for i in kept:
+        e = events[i]
+        e["score"] = round(float(scores[i]), 3)
+        out.append(e)
+    return out
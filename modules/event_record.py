@@ -0,0 +1,121 @@
+import sys
+from datetime import datetime
+
+FIELDS = ("date", "year", "text", "surface", "anchor_sentence_index",
+          "sentence_start", "sentence_end", "score", "segment")
+OPTIONAL = ("score", "segment")  # only listed in keys() once set
+
+class EventRecord:
+    """
+    Compact event used through clustering, ranking and export.
+
+    Holds the date as an integer ordinal, an interned surface and the
+    (start, end) window into the article's shared sentence list instead of
+    a joined chunk; the text is only materialized when read, and replaced
+    by the (short) summary once set. Supports the dict-style access the
+    rest of the pipeline uses (e["text"], e.get("date"), dict(e)) and
+    converts to a plain dict with to_dict() at export time.
+    """
+
+    __slots__ = ("ordinal", "year", "surface", "anchor", "sent_start", "sent_end",
+                 "_sentences", "_text", "score", "segment")
+
+    def __init__(self, date=None, surface=None, text=None, year=None, anchor=-1,
+                 sentences=None, start=0, end=0):
+        self.ordinal = date.toordinal() if date else 0
+        self.year = year
+        self.surface = sys.intern(surface) if surface else surface
+        self.anchor = anchor
+        self.sent_start = start
+        self.sent_end = end
+        self._sentences = sentences
+        self._text = text
+        self.score = None
+        self.segment = None
+
+    @classmethod
+    def from_dict(cls, d):
+        rec = cls(d.get("date"), d.get("surface"), d.get("text"), d.get("year"),
+                  d.get("anchor_sentence_index", -1), None,
+                  d.get("sentence_start", 0), d.get("sentence_end", 0))
+        rec.score = d.get("score")
+        rec.segment = d.get("segment")
+        return rec
+
+    @property
+    def date(self):
+        return datetime.fromordinal(self.ordinal) if self.ordinal else None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            return " ".join(self._sentences[self.sent_start:self.sent_end])
+        return self._text
+
+    def text_prefix(self, n: int) -> str:
+        """First `n` characters of text without joining the whole window."""
+        if self._text is not None:
+            return self._text[:n]
+        parts, size = [], 0
+        for sent in self._sentences[self.sent_start:self.sent_end]:
+            parts.append(sent)
+            size += len(sent) + 1
+            if size > n:
+                break
+        return " ".join(parts)[:n]
+
+    # ----- dict-style access -----
+
+    def __getitem__(self, key):
+        if key == "date":
+            return self.date
+        if key == "text":
+            return self.text
+        if key == "anchor_sentence_index":
+            return self.anchor
+        if key == "sentence_start":
+            return self.sent_start
+        if key == "sentence_end":
+            return self.sent_end
+        if key in ("year", "surface", "score", "segment"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "date":
+            self.ordinal = value.toordinal() if value else 0
+        elif key == "text":
+            self._text = value
+            self._sentences = None  # summary replaces the window; release the article's sentences
+        elif key == "surface":
+            self.surface = sys.intern(value) if value else value
+        elif key == "anchor_sentence_index":
+            self.anchor = value
+        elif key == "sentence_start":
+            self.sent_start = value
+        elif key == "sentence_end":
+            self.sent_end = value
+        elif key in ("year", "score", "segment"):
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in FIELDS and (key not in OPTIONAL or getattr(self, key) is not None)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        return [k for k in FIELDS if k in self]
+
+    def to_dict(self) -> dict:
+        return {k: self[k] for k in self.keys()}
+
+    def __repr__(self):
+        return f"EventRecord({self.to_dict()!r})"
@@ -1,32 +1,42 @@
 import re
-from .settings import TRIM_AFTER_TOKENS, MAX_EVENT_LEN_CHARS
+from typing import Dict, List
+from .text_rules import get_rules
 
-def _trim_noise(text: str) -> str:
-    """Remove junk after ads or noise markers"""
-    for token in TRIM_AFTER_TOKENS:
-        if token in text:
-            text = text.split(token)[0]
-    return text
+BRACKETS_RE = re.compile(r"\([^)]*\)")
+CLAUSE_SPLIT_RE = re.compile(r"(?<=\.)\s+| but | however ")
+SPACES_RE = re.compile(r"\s+")
 
-def summarize_event(text: str) -> str:
-    """Clean and shorten event text for timeline output"""
+def _summarize(text: str, rules) -> str:
     if not text:
         return ""
 
     # Remove brackets content
-    text = re.sub(r"\([^)]*\)", "", text)
+    text = BRACKETS_RE.sub("", text)
 
     # Remove long descriptions
-    text = _trim_noise(text)
+    text = rules.trim(text)
 
     # Keep main part of sentence
-    text = re.split(r"(?<=\.)\s+| but | however ", text)[0]
+    m = CLAUSE_SPLIT_RE.search(text)
+    if m:
+        text = text[:m.start()]
 
     # Remove duplicate spaces
-    text = re.sub(r"\s+", " ", text).strip()
+    text = SPACES_RE.sub(" ", text).strip()
 
     # Too long? Truncate
-    if len(text) > MAX_EVENT_LEN_CHARS:
-        text = text[:MAX_EVENT_LEN_CHARS].rsplit(" ", 1)[0] + "..."
+    if len(text) > rules.max_len:
+        text = text[:rules.max_len].rsplit(" ", 1)[0] + "..."
 
     return text.strip()
+
+def summarize_event(text: str) -> str:
+    """Clean and shorten event text for timeline output"""
+    return _summarize(text, get_rules())
+
+def summarize_events(events: List[Dict]):
+    """Summarize every event's text in place with one snapshot of the rules."""
+    rules = get_rules()
+    for e in events:
+        e["text"] = _summarize(e["text"], rules)
+    return events
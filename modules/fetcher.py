@@ -0,0 +1,180 @@
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+from .article_cache import content_hash
+from .settings import (
+    FETCH_USER_AGENT, FETCH_TIMEOUT, FETCH_RETRIES, FETCH_BACKOFF,
+    FETCH_MAX_WORKERS, FETCH_PER_HOST_LIMIT, FETCH_REMEMBER_PAGES
+)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class FetchError(IOError):
+    """The server answered with a non-2xx status (after retries)."""
+
+    def __init__(self, url, status):
+        super().__init__(f"HTTP {status}: {url}")
+        self.url = url
+        self.status = status
+
+def is_ok(status) -> bool:
+    return status is not None and 200 <= status < 300
+
+CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+
+def declared_charset(content_type):
+    """Charset named in a Content-Type header, or None (the page's own <meta> then decides)."""
+    m = CHARSET_RE.search(content_type or "")
+    return m.group(1) if m else None
+
+def fixture_name(url: str) -> str:
+    """File name a URL is looked up under in a fixtures directory."""
+    parts = urlparse(url)
+    return re.sub(r"[^A-Za-z0-9]+", "_", parts.netloc + parts.path).strip("_") + ".html"
+
+class ArticleFetcher:
+    """
+    Pooled HTTP fetcher: one keep-alive session, retry with backoff,
+    per-host concurrency limits and ETag/Last-Modified revalidation.
+
+    Pages are dicts with url, status, content (raw bytes), encoding (the
+    declared charset, if any), etag, last_modified, content_hash and
+    from_cache. Responses other than 2xx raise FetchError and are never
+    cached. With an ArticleCache, fresh
+    cached pages skip the network, stale ones are revalidated, and
+    `offline` replays only from the cache. For offline tests, `fixtures_dir`
+    serves pages from files named by fixture_name(), and `base_url`
+    redirects every request to a local stand-in server while keeping the
+    original URL.
+    """
+
+    def __init__(self, max_workers=FETCH_MAX_WORKERS, per_host=FETCH_PER_HOST_LIMIT,
+                 retries=FETCH_RETRIES, backoff=FETCH_BACKOFF, timeout=FETCH_TIMEOUT,
+                 fixtures_dir=None, base_url=None, cache=None, offline=False):
+        self.cache = cache
+        self.offline = offline
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.base_url = base_url
+
+        import requests  # deferred until a fetcher is actually built
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({"GET"}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = FETCH_USER_AGENT
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._pages = OrderedDict()  # url -> last page with validators
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, host: str):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _target(self, url: str) -> str:
+        if not self.base_url:
+            return url
+        parts = urlparse(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        return self.base_url.rstrip("/") + path
+
+    def _remembered(self, url: str):
+        with self._lock:
+            return self._pages.get(url)
+
+    def _remember(self, page: dict):
+        with self._lock:
+            self._pages[page["url"]] = page
+            self._pages.move_to_end(page["url"])
+            while len(self._pages) > FETCH_REMEMBER_PAGES:
+                self._pages.popitem(last=False)
+
+    def _from_fixture(self, url: str) -> dict:
+        content = (self.fixtures_dir / fixture_name(url)).read_bytes()
+        return {"url": url, "status": 200, "content": content, "encoding": None, "etag": None,
+                "last_modified": None, "from_cache": False, "content_hash": content_hash(content)}
+
+    def fetch(self, url: str) -> dict:
+        """Fetch one page, revalidating a remembered or cached copy when possible."""
+        if self.fixtures_dir:
+            return self._from_fixture(url)
+
+        prev = self.cache.get_page(url) if self.cache else None
+        if prev and not is_ok(prev["status"]):
+            prev = None  # error pages cached by older versions are not served
+        if prev and (self.offline or self.cache.is_fresh(prev)):
+            return prev
+        if self.offline:
+            raise LookupError(f"Not in article cache (offline mode): {url}")
+        prev = prev or self._remembered(url)
+
+        headers = {}
+        if prev:
+            if prev["etag"]:
+                headers["If-None-Match"] = prev["etag"]
+            if prev["last_modified"]:
+                headers["If-Modified-Since"] = prev["last_modified"]
+
+        with self._slot(urlparse(url).netloc.lower()):
+            res = self.session.get(self._target(url), headers=headers, timeout=self.timeout)
+
+        if res.status_code == 304 and prev:
+            if self.cache:
+                self.cache.touch(url)
+            return dict(prev, from_cache=True)
+        if not is_ok(res.status_code):
+            raise FetchError(url, res.status_code)  # error pages are neither cached nor parsed
+
+        page = {
+            "url": url,
+            "status": res.status_code,
+            "content": res.content,
+            "encoding": declared_charset(res.headers.get("Content-Type")),
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "from_cache": False,
+            "content_hash": content_hash(res.content),
+        }
+        if self.cache:
+            self.cache.put_page(page)
+        elif page["etag"] or page["last_modified"]:
+            self._remember(page)
+        return page
+
+    def _fetch_safe(self, url: str):
+        try:
+            return url, self.fetch(url), None
+        except Exception as e:
+            return url, None, e
+
+    def fetch_many(self, urls):
+        """
+        Fetch URLs concurrently, yielding (url, page, error) in input order.
+        At most 2 x max_workers fetches are in flight, so long URL lists stream.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            for url in urls:
+                pending.append(pool.submit(self._fetch_safe, url))
+                if len(pending) >= 2 * self.max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
@@ -0,0 +1,229 @@
+import json
+import re
+from bisect import bisect_right
+from datetime import datetime
+from hashlib import blake2b
+from pathlib import Path
+from typing import List, Dict
+from .date_extractor import scan_date_mentions
+from .event_extractor import split_sentence_spans, sentences_with_dates, cluster_events
+from .event_summarizer import summarize_events
+from .timeline_builder import build_timeline, dedupe_events
+from .list_mode import split_list_items, build_events_from_items
+from .nlp_models import parse_many
+from .event_record import EventRecord
+from .settings import EVENT_WINDOW, LIST_MIN_ITEMS
+
+# Cheap sentence-ish segments used only to detect what changed between polls
+SEGMENT_RE = re.compile(r"\S.*?(?:[.!?]+(?=\s|$)|$)", re.S)
+
+def _segments(text: str):
+    """(hash, start, end) for each segment of `text`."""
+    out = []
+    for m in SEGMENT_RE.finditer(text):
+        digest = blake2b(m.group(0).encode("utf-8"), digest_size=8).hexdigest()
+        out.append((digest, m.start(), m.end()))
+    return out
+
+def _new_runs(segments, known, context, dated=frozenset(), dirty=frozenset()):
+    """
+    (parse_from, emit_from, emit_to, parse_to) segment index ranges around
+    each run of unseen (or `dirty`) segments. Events anchored within
+    `context` segments of new text are rebuilt (their window may now reach
+    it), and those are parsed with `context` more segments on each side so
+    every rebuilt event sees the same neighbours as in a full run.
+
+    Undated headlines pair with the nearest dated sentence anywhere in the
+    article, so the ranges also reach back and forward to the nearest known
+    `dated` segments: headlines between them are rebuilt and those dated
+    segments are parsed with them. Runs whose parsed ranges would overlap
+    are merged.
+    """
+    n = len(segments)
+    dated_at = [k for k, (h, _, _) in enumerate(segments) if h in dated and h not in dirty]
+    runs = []
+    i = 0
+    while i < n:
+        if segments[i][0] in known and segments[i][0] not in dirty:
+            i += 1
+            continue
+        j = i
+        while j < n and (segments[j][0] not in known or segments[j][0] in dirty):
+            j += 1
+        k = bisect_right(dated_at, i - 1)
+        before = dated_at[k - 1] if k else -1
+        after = dated_at[k] if k < len(dated_at) and dated_at[k] >= j else n
+        emit_from, emit_to = max(min(i - context, before + 1), 0), min(max(j + context, after), n)
+        parse_from = max(min(emit_from - context, before), 0)
+        parse_to = min(max(emit_to + context, after + 1), n)
+        if runs and parse_from <= runs[-1][3]:
+            runs[-1][2:] = [max(runs[-1][2], emit_to), max(runs[-1][3], parse_to)]
+        else:
+            runs.append([parse_from, emit_from, emit_to, parse_to])
+        i = j
+    return [tuple(r) for r in runs]
+
+def _dirty_neighbours(order, current):
+    """
+    Surviving segment after (or, at the end, before) each segment of the
+    previous text `order` that is gone: the events around it lost a
+    neighbour, and headlines paired with its date must be paired again.
+    """
+    dirty = set()
+    last = None
+    orphan = False
+    for h in order:
+        if h in current:
+            if orphan:
+                dirty.add(h)
+                orphan = False
+            last = h
+        else:
+            orphan = True
+    if orphan and last is not None:
+        dirty.add(last)
+    return dirty
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+def _from_iso(value):
+    return datetime.fromisoformat(value) if value else None
+
+class IncrementalTimeline:
+    """
+    Per-article state for live blogs and re-published stories.
+
+    Keeps the hash of every text segment seen so far, the date mentions
+    found in it and the events already emitted. update() runs spaCy and
+    date extraction only on new or changed segments plus `window`
+    segments of known context on each side, rebuilds the events anchored
+    next to the new text and merges them into the timeline with
+    dedupe_events. Events whose segment disappeared from the article are
+    dropped and the ones around it rebuilt. The segments are kept in text
+    order, so removals can be placed. List articles are tracked per item,
+    as in list mode.
+    """
+
+    def __init__(self, url=None, ref_date=None, window=EVENT_WINDOW):
+        self.url = url
+        self.ref_date = ref_date or datetime.now()
+        self.window = window
+        self.mode = "normal"  # or "list": segments are then list items
+        self.segments = {}  # hash -> [(surface, normalized date)]
+        self.events = []
+
+    def _events_for_run(self, text, run, emit_from, emit_to, doc):
+        offset = run[0][1]
+        seg_starts = [start - offset for _, start, _ in run]
+        spans = split_sentence_spans(text, doc)
+        sentences = [s for s, _, _ in spans]
+        mentions = scan_date_mentions(text, self.ref_date, doc)
+        hits = sentences_with_dates(sentences, mentions, offsets=[(a, b) for _, a, b in spans])
+
+        found = {h: [] for h, _, _ in run}
+        for m in mentions:
+            h = run[max(bisect_right(seg_starts, m["start"]) - 1, 0)][0]
+            found[h].append((m["surface"], m["normalized"]))
+        self.segments.update(found)
+
+        events = []
+        for e in cluster_events(sentences, hits, window=self.window):
+            k = max(bisect_right(seg_starts, spans[e["anchor_sentence_index"]][1]) - 1, 0)
+            if emit_from <= k < emit_to:  # the rest belongs to context parsed for its neighbours
+                e["segment"] = run[k][0]
+                events.append(e)
+        for e in summarize_events(events):
+            e.setdefault("year", None)
+        return events
+
+    def _update_items(self, items) -> Dict:
+        hashes = [blake2b(item.encode("utf-8"), digest_size=8).hexdigest() for item in items]
+        current = set(hashes)
+        new = [(h, item) for h, item in zip(hashes, items) if h not in self.segments]
+
+        new_events = build_events_from_items([item for _, item in new], self.ref_date)
+        for (h, _), e in zip(new, new_events):
+            e["segment"] = h
+            self.segments[h] = [(e["surface"], e["date"])] if e["date"] else []
+
+        kept = [e for e in self.events if e.get("segment") in current]
+        dropped = len(self.events) - len(kept)
+        self.events = dedupe_events(kept + new_events)
+        self.segments = {h: self.segments.get(h, []) for h in current}
+        return {
+            "segments": len(items),
+            "new_segments": len(new),
+            "parsed_chars": sum(len(item) for _, item in new),
+            "new_events": len(new_events),
+            "dropped_events": dropped,
+        }
+
+    def update(self, text: str) -> Dict:
+        """Process a new version of the article text; returns what changed."""
+        text = text or ""
+        items = split_list_items(text)
+        mode = "list" if len(items) >= LIST_MIN_ITEMS else "normal"
+        if mode != self.mode:  # segment and item hashes are not comparable: start over
+            self.mode = mode
+            self.segments = {}
+            for e in self.events:
+                e["segment"] = None  # dropped below
+        if mode == "list":
+            return self._update_items(items)
+
+        segments = _segments(text)
+        current = {h for h, _, _ in segments}
+        dated = {h for h, ms in self.segments.items() if ms}
+        dirty = _dirty_neighbours(self.segments, current)
+        runs = _new_runs(segments, self.segments, self.window, dated, dirty)
+        new_segments = sum(h not in self.segments for h, _, _ in segments)
+        rebuilt = {segments[k][0] for _, lo, hi, _ in runs for k in range(lo, hi)}
+        texts = [text[segments[a][1]:segments[b - 1][2]] for a, _, _, b in runs]
+
+        new_events = []
+        for (a, lo, hi, b), chunk, doc in zip(runs, texts, parse_many(texts)):
+            new_events.extend(self._events_for_run(chunk, segments[a:b], lo - a, hi - a, doc))
+
+        kept = [e for e in self.events if e.get("segment") in current and e.get("segment") not in rebuilt]
+        dropped = sum(e.get("segment") not in current for e in self.events)
+        self.events = dedupe_events(kept + new_events)
+        self.segments = {h: self.segments.get(h, []) for h, _, _ in segments}  # in text order
+        return {
+            "segments": len(segments),
+            "new_segments": new_segments,
+            "parsed_chars": sum(len(t) for t in texts),
+            "new_events": len(new_events),
+            "dropped_events": dropped,
+        }
+
+    def timeline(self) -> List[Dict]:
+        return build_timeline(self.events)
+
+    def to_state(self) -> Dict:
+        return {
+            "url": self.url,
+            "ref_date": _iso(self.ref_date),
+            "window": self.window,
+            "mode": self.mode,
+            "segments": {h: [[s, _iso(dt)] for s, dt in ms] for h, ms in self.segments.items()},
+            "events": [dict(e, date=_iso(e.get("date"))) for e in self.events],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "IncrementalTimeline":
+        tl = cls(state["url"], _from_iso(state["ref_date"]), state["window"])
+        tl.mode = state.get("mode", "normal")
+        tl.segments = {h: [(s, _from_iso(dt)) for s, dt in ms] for h, ms in state["segments"].items()}
+        tl.events = [EventRecord.from_dict(dict(e, date=_from_iso(e["date"]))) for e in state["events"]]
+        return tl
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_state(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalTimeline":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_state(json.load(f))
@@ -1,7 +1,21 @@
+import re
 import json
 import csv
+import gzip
+import os
 from pathlib import Path
 
+# Stable column order for streamed CSV rows (batch exports add the source columns)
+EXPORT_FIELDS = ["source_url", "source_title", "date", "year", "event", "matched_phrase"]
+
+def open_text(path: str, mode: str = "r"):
+    """Open a text file, transparently gzip-compressed when the path ends in .gz."""
+    if mode[0] in "wa":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
 def save_json(data, path: str):
     """Save JSON file nicely formatted."""
     Path(path).parent.mkdir(parents=True, exist_ok=True)
@@ -17,3 +31,166 @@ def save_csv(rows, path: str):
         writer = csv.DictWriter(f, fieldnames=rows[0].keys())
         writer.writeheader()
         writer.writerows(rows)
+
+class JsonlWriter:
+    """Append one JSON record per line; nothing is held in memory between writes."""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.count = 0
+        self._f = open_text(path, "a" if append else "w")
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._f.write("\n")
+        self.count += 1
+
+    def checkpoint(self) -> int:
+        """Make everything written so far durable; returns the file size to truncate back to on resume."""
+        if str(self.path).endswith(".gz"):  # finish the gzip member so the file can be cut here
+            self._f.close()
+            self._f = open_text(self.path, "a")
+        else:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        return os.path.getsize(self.path)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CsvWriter:
+    """
+    Stream rows to CSV with a fixed header. Missing fields are written
+    empty and unknown ones ignored, so rows from different articles
+    always line up. With `append`, rows are added to an existing file
+    and the header is only written if the file is new.
+    """
+
+    def __init__(self, path: str, fieldnames=EXPORT_FIELDS, append: bool = False):
+        self.path = path
+        self.count = 0
+        self.fieldnames = fieldnames
+        new = not (append and Path(path).exists() and Path(path).stat().st_size)
+        self._f = open_text(path, "a" if append else "w")
+        self._writer = csv.DictWriter(self._f, fieldnames=fieldnames, extrasaction="ignore")
+        if new:
+            self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self.count += 1
+
+    def write_timeline(self, result):
+        """Write every row of one timeline result, tagged with its source."""
+        source = {"source_url": result.get("source_url"), "source_title": result.get("source_title")}
+        for row in result.get("timeline", []):
+            self.write(dict(source, **row))
+
+    def checkpoint(self) -> int:
+        """Make everything written so far durable; returns the file size to truncate back to on resume."""
+        if str(self.path).endswith(".gz"):  # finish the gzip member so the file can be cut here
+            self._f.close()
+            self._f = open_text(self.path, "a")
+            self._writer = csv.DictWriter(self._f, fieldnames=self.fieldnames, extrasaction="ignore")
+        else:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        return os.path.getsize(self.path)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def truncate_output(path: str, size: int):
+    """Cut a file back to `size` bytes (a checkpoint), dropping whatever was written after it."""
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+def iter_jsonl(path: str):
+    """Lazily yield records from a (optionally .gz) JSONL file."""
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_csv_rows(path: str):
+    """Lazily yield rows from a (optionally .gz) CSV file as dicts."""
+    with open_text(path) as f:
+        yield from csv.DictReader(f)
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_")[:120] or "article"
+
+def iter_batch_inputs(path: str):
+    """
+    Yield batch inputs as dicts with id, url, text and title.
+    Accepts a directory of saved .txt articles, a JSONL file (optionally
+    .gz) whose records carry a url or text/body, or a plain file of URLs.
+    An input that cannot be read is yielded with an "error" message
+    instead, so one bad record does not end the batch.
+    """
+    src = Path(path)
+    if src.is_dir():
+        for f in sorted(src.glob("*.txt")):
+            rec = {"id": _slug(f.stem), "url": None, "title": f.stem, "text": None}
+            try:
+                rec["text"] = f.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                rec["error"] = str(e)
+            yield rec
+        return
+
+    is_jsonl = ".jsonl" in src.suffixes
+    with open_text(str(src)) as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if is_jsonl:
+                try:
+                    rec = json.loads(line)
+                except ValueError as e:
+                    yield _bad_input(n, f"invalid JSON: {e}")
+                    continue
+                if not isinstance(rec, dict):
+                    yield _bad_input(n, "record is not a JSON object")
+                    continue
+                url = rec.get("url")
+                text = rec.get("text") or rec.get("body")
+                rec_id = rec.get("id") or rec.get("request_id") or (isinstance(url, str) and _slug(url)) or f"line_{n}"
+                out = {"id": _slug(str(rec_id)), "url": url, "title": rec.get("title"), "text": text}
+                if not isinstance(url, (str, type(None))) or not isinstance(text, (str, type(None))):
+                    out["error"] = f"line {n}: url and text must be strings"
+                elif not url and not text:
+                    out["error"] = f"line {n}: record has neither url nor text"
+                yield out
+            else:
+                yield {"id": _slug(line), "url": line, "title": None, "text": None}
+
+def _bad_input(n, message):
+    return {"id": f"line_{n}", "url": None, "title": None, "text": None, "error": message}
+
+def iter_timeline_results(path: str):
+    """
+    Yield saved timeline results ({source_url, source_title, timeline}).
+    Accepts a directory of per-article JSON files (as written by --batch)
+    or a JSONL file (optionally .gz) with one result per line.
+    """
+    src = Path(path)
+    if src.is_dir():
+        for f in sorted(src.glob("*.json")):
+            with open(f, encoding="utf-8") as fh:
+                yield json.load(fh)
+        return
+    yield from iter_jsonl(str(src))
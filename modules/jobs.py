@@ -0,0 +1,161 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .scheduler import ArticleTimeout
+from .settings import JOB_MAX_WORKERS, JOB_KEEP_SECONDS, JOB_TIMEOUT_SECONDS
+
+def _init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is handled by the web process
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+def _on_alarm(signum, frame):
+    raise ArticleTimeout()
+
+def _run_job(fn, timeout, args):
+    """fn(*args) in a worker process, interrupted after `timeout` seconds so the worker is freed."""
+    try:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        return fn(*args)
+    except ArticleTimeout:
+        raise TimeoutError(f"timed out after {timeout}s") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+class JobQueue:
+    """
+    Background jobs on a bounded worker pool.
+    Submitting a key that already has a pending job returns that job
+    instead of starting another one.
+
+    With `processes=True` jobs run in forked worker processes. Build the
+    queue after loading the model: the workers are forked right away and
+    share those pages copy-on-write. Job functions and results must then
+    be picklable, and side effects belong in the `then` callback, which
+    runs in this process. A worker that dies (OOM kill, crash in a C
+    extension) fails the jobs it had and the pool is replaced. The
+    replacement workers come from a fork server rather than from this
+    (by then multi-threaded) process, so they load the model themselves
+    on their first job.
+
+    A job still pending `timeout` seconds after it was submitted is
+    failed, and its key can be submitted again. Worker processes also
+    interrupt a job at that limit, so a stuck fetch does not hold a
+    worker forever; threads cannot be interrupted and only the job is
+    failed.
+    """
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS, keep_seconds=JOB_KEEP_SECONDS, processes=False,
+                 timeout=JOB_TIMEOUT_SECONDS):
+        self.keep_seconds = keep_seconds
+        self.timeout = timeout
+        self.processes = processes
+        self.max_workers = max_workers
+        self._jobs = {}    # id -> job
+        self._active = {}  # key -> id of the pending job
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self, start_method="fork"):
+        if not self.processes:
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                   mp_context=multiprocessing.get_context(start_method))
+        pool.submit(os.getpid).result()  # start every worker now, before serving threads start
+        return pool
+
+    def _replace_pool(self, broken):
+        """
+        Start a fresh pool in place of `broken` (once, however many jobs
+        noticed it). Forking a process that is serving requests on several
+        threads can copy a lock some other thread holds, so the new workers
+        come from the fork server.
+        """
+        with self._pool_lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False)
+                self._pool = self._new_pool("forkserver")
+
+    def _submit(self, fn, args):
+        if self.processes:
+            fn, args = _run_job, (fn, self.timeout, args)
+        pool = self._pool
+        try:
+            return pool, pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self._pool
+            return pool, pool.submit(fn, *args)
+
+    def submit(self, key, fn, *args, then=None) -> dict:
+        """Run fn(*args); `then(output)`, if given, turns the output into the job result."""
+        with self._lock:
+            self._prune()
+            self._expire()
+            job_id = self._active.get(key)
+            if job_id:
+                return dict(self._jobs[job_id])
+            job_id = uuid.uuid4().hex
+            job = {"id": job_id, "key": key, "status": "pending", "result": None,
+                   "error": None, "created_at": time.time(), "finished_at": None}
+            self._jobs[job_id] = job
+            self._active[key] = job_id
+        try:
+            pool, future = self._submit(fn, args)
+        except Exception:
+            with self._lock:  # never leave a pending job that no worker will finish
+                del self._jobs[job_id]
+                if self._active.get(key) == job_id:
+                    del self._active[key]
+            raise
+        future.add_done_callback(lambda f: self._finish(job_id, f, then, pool))
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _finish(self, job_id, future, then=None, pool=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            expired = job is None or job["status"] != "pending"  # already failed at its deadline
+        try:
+            result = future.result()
+            if then is not None and not expired:
+                result = then(result)
+            outcome = {"result": result, "status": "done"}
+        except BrokenProcessPool as e:
+            outcome = {"error": str(e), "status": "error"}
+            threading.Thread(target=self._replace_pool, args=(pool,), daemon=True).start()
+        except Exception as e:
+            outcome = {"error": str(e), "status": "error"}
+        if expired:
+            return
+        with self._lock:
+            job.update(outcome)
+            job["finished_at"] = time.time()
+            if self._active.get(job["key"]) == job_id:
+                del self._active[job["key"]]
+
+    def _expire(self):
+        now = time.time()
+        for job in self._jobs.values():
+            if job["status"] == "pending" and now - job["created_at"] > self.timeout:
+                job.update(status="error", error=f"timed out after {self.timeout}s", finished_at=now)
+                if self._active.get(job["key"]) == job["id"]:
+                    del self._active[job["key"]]
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [i for i, j in self._jobs.items() if j["finished_at"] and j["finished_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,14 @@
 import re
+from bisect import bisect_right
 from datetime import datetime
 from typing import List, Dict, Optional
 from .event_summarizer import summarize_event
-from .date_extractor import extract_date_mentions, find_years
+from .date_extractor import scan_date_mentions, dedupe_mentions, find_years
+from .nlp_models import parse_article, apply_ner
+from .event_record import EventRecord
+from .settings import NER_MIN_REGEX_DATES
+
+ITEM_JOINER = "\n\n"
 
 # Detect numbered or bullet-point list articles
 ITEM_SPLIT_RE = re.compile(
@@ -18,12 +24,47 @@ def split_list_items(text: str) -> List[str]:
     items = [p.strip() for p in parts if p.strip() and len(p.strip()) > 25]
     return items
 
+def _mentions_per_item(items: List[str], ref_date: datetime) -> List[List[Dict]]:
+    """
+    Scan all items in one pass (one spaCy parse, one regex sweep) and map
+    each date mention back to its item by character offset.
+
+    Without NER in the parse (regex profile), NER_MIN_REGEX_DATES applies
+    per item, as if each item were scanned on its own: NER runs once over
+    the joined text if any item is short of regex dates, and its dates
+    are only kept for those items.
+    """
+    starts = []
+    pos = 0
+    for item in items:
+        starts.append(pos)
+        pos += len(item) + len(ITEM_JOINER)
+    joined = ITEM_JOINER.join(items)
+
+    def assign(mentions):
+        per_item = [[] for _ in items]
+        for m in mentions:
+            k = bisect_right(starts, m["start"]) - 1
+            if m["end"] > starts[k] + len(items[k]):  # match ran across the joiner
+                continue
+            per_item[k].append(m)
+        return per_item
+
+    doc = parse_article(joined)
+    per_item = assign(scan_date_mentions(joined, ref_date, doc))
+    if not doc.has_annotation("ENT_IOB") and any(len(found) < NER_MIN_REGEX_DATES for found in per_item):
+        regex_counts = [len(found) for found in per_item]
+        per_item = [
+            [m for m in found if m["kind"] != "ner" or count < NER_MIN_REGEX_DATES]
+            for found, count in zip(assign(scan_date_mentions(joined, ref_date, apply_ner(doc))), regex_counts)
+        ]
+    return [dedupe_mentions(found) for found in per_item]
+
 def build_events_from_items(items: List[str], ref_date: datetime) -> List[Dict]:
     """Convert list items into timeline events (supports year-based events)."""
     events = []
-    for item in items:
+    for item, mentions in zip(items, _mentions_per_item(items, ref_date)):
         # Extract date or year
-        mentions = extract_date_mentions(item, ref_date)
         year_candidates = find_years(item, ref_date)
         event_date = mentions[0]["normalized"] if mentions else None
         event_year = year_candidates[0] if year_candidates else None
@@ -31,11 +72,10 @@ def build_events_from_items(items: List[str], ref_date: datetime) -> List[Dict]:
         # Clean sentence
         summary = summarize_event(item)
 
-        events.append({
-            "date": event_date,
-            "year": event_year,
-            "text": summary,
-            "surface": mentions[0]["surface"] if mentions else str(event_year) if event_year else None,
-            "anchor_sentence_index": -1
-        })
+        events.append(EventRecord(
+            event_date,
+            mentions[0]["surface"] if mentions else str(event_year) if event_year else None,
+            text=summary,
+            year=event_year,
+        ))
     return events
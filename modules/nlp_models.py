@@ -0,0 +1,52 @@
+import threading
+from .settings import SPACY_MODEL, SPACY_BATCH_SIZE, SPACY_N_PROCESS, SPACY_PROFILE, SPACY_PROFILES
+
+# One pipeline per (model, profile), shared by every module in the process
+_MODELS = {}
+_LOCK = threading.Lock()
+_profile = SPACY_PROFILE
+
+def set_profile(profile: str):
+    """Select the pipeline profile used by later get_nlp() calls."""
+    global _profile
+    if profile not in SPACY_PROFILES:
+        raise ValueError(f"Unknown spaCy profile: {profile}")
+    _profile = profile
+
+def _load(name: str, profile: str):
+    import spacy  # deferred: importing spaCy alone costs most of a cold start
+    nlp = spacy.load(name)
+    cfg = SPACY_PROFILES[profile]
+    for pipe in cfg["disable"]:
+        if pipe in nlp.pipe_names:
+            nlp.disable_pipe(pipe)
+    for pipe in cfg["enable"]:
+        if pipe in nlp.disabled:
+            nlp.enable_pipe(pipe)
+    return nlp
+
+def get_nlp(name: str = SPACY_MODEL, profile: str = None):
+    """Return the shared spaCy pipeline, importing spaCy and loading it on first use."""
+    key = (name, profile or _profile)
+    nlp = _MODELS.get(key)
+    if nlp is None:
+        with _LOCK:
+            nlp = _MODELS.get(key)
+            if nlp is None:
+                nlp = _MODELS[key] = _load(*key)
+    return nlp
+
+def parse_article(text: str):
+    """Parse article text once so sentences and DATE entities come from one Doc."""
+    return get_nlp()(text or "")
+
+def parse_many(texts, batch_size: int = SPACY_BATCH_SIZE, n_process: int = SPACY_N_PROCESS, as_tuples=False):
+    """Stream many texts through nlp.pipe; yields Docs (or (Doc, context) pairs)."""
+    return get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process, as_tuples=as_tuples)
+
+def apply_ner(doc):
+    """Run the (possibly disabled) NER component on a Doc parsed without it."""
+    nlp = get_nlp()
+    if "ner" not in nlp.component_names:
+        return doc
+    return nlp.get_pipe("ner")(doc)
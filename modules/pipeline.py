@@ -0,0 +1,209 @@
+import threading
+import time
+from datetime import datetime
+from .scraper import fetch_article, get_fetcher
+from .list_mode import split_list_items, build_events_from_items
+from .event_extractor import split_sentence_spans, sentences_with_dates, cluster_events
+from .date_extractor import scan_date_mentions, date_cache_stats
+from .event_summarizer import summarize_event, summarize_events
+from .timeline_builder import build_timeline, to_export_rows
+from .nlp_models import parse_article
+from .event_record import EventRecord
+from .settings import EVENT_WINDOW, LIST_MIN_ITEMS, EVENT_TOP_K, EVENT_BUDGET
+
+class EmptyArticleError(ValueError):
+    """The fetched page yielded no article text."""
+
+# Small article touching every date shape, used by TimelinePipeline.warmup()
+WARMUP_TEXT = (
+    "The committee first met on January 12, 2024 to review the proposal in detail. "
+    "Members agreed on 3 March 2024 that construction would begin in the spring. "
+    "Work ran from April 19 to June 1, 2024 and a second phase was approved on 2024-07-15. "
+    "The final report is expected in Q3 2025, with a public hearing planned for September 2025."
+)
+
+# ----- Stages: each takes (pipeline, ctx) and updates the shared context -----
+
+def stage_fetch(pipeline, ctx):
+    if ctx["article"] is None:
+        ctx["article"] = fetch_article(ctx["url"], pipeline.fetcher)
+    article = ctx["article"]
+    if not article["text"]:
+        raise EmptyArticleError("Failed to extract article text.")
+    ctx["text"] = article["text"]
+    ctx["ref_date"] = article["published_at"] or datetime.now()
+
+def stage_detect_list(pipeline, ctx):
+    ctx["items"] = split_list_items(ctx["text"])
+    ctx["mode"] = "list" if len(ctx["items"]) >= LIST_MIN_ITEMS else "normal"
+
+def stage_list_events(pipeline, ctx):
+    if ctx["mode"] == "list":
+        ctx["events"] = build_events_from_items(ctx["items"], ctx["ref_date"])
+
+def stage_sentences(pipeline, ctx):
+    if ctx["mode"] == "normal":
+        if ctx["doc"] is None:
+            ctx["doc"] = parse_article(ctx["text"])  # one parse shared by sentences and dates
+        ctx["spans"] = split_sentence_spans(ctx["text"], ctx["doc"])
+        ctx["sentences"] = [s for s, _, _ in ctx["spans"]]
+
+def stage_mentions(pipeline, ctx):
+    if ctx["mode"] == "normal":
+        ctx["mentions"] = scan_date_mentions(ctx["text"], ctx["ref_date"], ctx["doc"])
+        offsets = [(a, b) for _, a, b in ctx["spans"]]
+        ctx["hits"] = sentences_with_dates(ctx["sentences"], ctx["mentions"], offsets=offsets)
+
+def stage_cluster(pipeline, ctx):
+    if ctx["mode"] == "normal":
+        ctx["events"] = cluster_events(ctx["sentences"], ctx["hits"], window=pipeline.window)
+
+def stage_rank(pipeline, ctx):
+    if pipeline.top_k or pipeline.budget:
+        from .event_ranker import rank_events  # NumPy is only imported when ranking is on
+        ctx["candidates"] = ctx["events"]
+        if ctx["mode"] == "normal":
+            ctx["events"] = rank_events(ctx["events"], ctx["spans"], ctx["doc"],
+                                        top_k=pipeline.top_k, budget=pipeline.budget)
+        else:  # list items are scored on their text; the budget bounds listicles too
+            ctx["events"] = rank_events(ctx["events"], top_k=pipeline.top_k, budget=pipeline.budget)
+
+def stage_summarize(pipeline, ctx):
+    if ctx["mode"] == "normal":
+        for e in summarize_events(ctx["events"]):
+            if "year" not in e:
+                e["year"] = None
+
+def stage_build(pipeline, ctx):
+    article = ctx["article"]
+    events = ctx["events"]
+    # 📌 Fallback when no events parsed
+    if not events:
+        events = [EventRecord(article["published_at"], "article_header", text=summarize_event(article["title"]))]
+    rows = to_export_rows(build_timeline(events))
+    ctx["result"] = {
+        "source_title": article["title"],
+        "source_url": article["url"],
+        "reference_date": ctx["ref_date"].strftime("%Y-%m-%d"),
+        "count": len(rows),
+        "timeline": rows
+    }
+
+DEFAULT_STAGES = [
+    ("fetch", stage_fetch),
+    ("detect_list", stage_detect_list),
+    ("list_events", stage_list_events),
+    ("sentences", stage_sentences),
+    ("mentions", stage_mentions),
+    ("cluster", stage_cluster),
+    ("rank", stage_rank),
+    ("summarize", stage_summarize),
+    ("build", stage_build),
+]
+
+def _empty_totals():
+    return {"runs": 0, "errors": 0, "stage_seconds": {}, "counts": {}, "cache": {}}
+
+class TimelinePipeline:
+    """
+    The fetch → list detection → sentences → mentions → cluster → rank →
+    summarize → build sequence shared by main.py and app.py. Ranking only
+    drops events when `top_k` or `budget` is set.
+
+    Stages are (name, fn) pairs over a context dict and can be replaced
+    or extended. Every run records per-stage wall time, sentence/mention/
+    hit/event counts and cache hits in ctx["metrics"]; totals across runs
+    are available from snapshot().
+    """
+
+    def __init__(self, window=EVENT_WINDOW, stages=None, fetcher=None, top_k=EVENT_TOP_K, budget=EVENT_BUDGET):
+        self.window = window
+        self.top_k = top_k
+        self.budget = budget
+        self.stages = list(stages or DEFAULT_STAGES)
+        self.fetcher = fetcher
+        self._lock = threading.Lock()
+        self._totals = _empty_totals()
+        self._last = None
+
+    def replace_stage(self, name, fn):
+        self.stages = [(n, fn if n == name else f) for n, f in self.stages]
+
+    def insert_stage(self, after, name, fn):
+        i = [n for n, _ in self.stages].index(after) + 1
+        self.stages.insert(i, (name, fn))
+
+    def _cache_counters(self):
+        counters = {f"date_{k}": v for k, v in date_cache_stats().items() if k in ("hits", "misses", "fast_path")}
+        cache = (self.fetcher or get_fetcher()).cache
+        if cache is not None:
+            counters.update(cache.stats)
+        return counters
+
+    def run(self, url=None, article=None, doc=None) -> dict:
+        """Run every stage for a URL (or an already fetched article); returns the context."""
+        ctx = {"url": url or (article and article["url"]), "article": article, "doc": doc,
+               "mode": None, "items": [], "sentences": [], "mentions": [], "hits": [],
+               "candidates": [], "events": [], "result": None}
+        timings = {}
+        before = self._cache_counters()
+        try:
+            for name, fn in self.stages:
+                t0 = time.perf_counter()
+                fn(self, ctx)
+                timings[name] = time.perf_counter() - t0
+        except Exception:
+            with self._lock:
+                self._totals["runs"] += 1
+                self._totals["errors"] += 1
+            raise
+
+        after = self._cache_counters()
+        ctx["metrics"] = {
+            "mode": ctx["mode"],
+            "stage_seconds": timings,
+            "total_seconds": sum(timings.values()),
+            "counts": {k: len(ctx[k]) for k in ("items", "sentences", "mentions", "hits", "candidates", "events")},
+            "cache": {k: after[k] - before.get(k, 0) for k in after},
+        }
+        self.record(ctx["metrics"])
+        return ctx
+
+    def warmup(self) -> dict:
+        """
+        Pay the cold-start costs up front: import spaCy and load the model,
+        then run WARMUP_TEXT through every stage so regexes are compiled,
+        dateutil is imported and the caches are primed. Returns seconds per step.
+        """
+        t0 = time.perf_counter()
+        parse_article("")
+        t1 = time.perf_counter()
+        self.run(article={"title": "Warmup", "text": WARMUP_TEXT, "published_at": datetime(2025, 1, 1),
+                          "url": None})
+        t2 = time.perf_counter()
+        with self._lock:  # the warmup run is not real traffic
+            self._totals = _empty_totals()
+            self._last = None
+        return {"model_seconds": t1 - t0, "pipeline_seconds": t2 - t1}
+
+    def record(self, metrics):
+        """Add one run's metrics to the totals (also used for runs made in worker processes)."""
+        with self._lock:
+            t = self._totals
+            t["runs"] += 1
+            for group in ("stage_seconds", "counts", "cache"):
+                for k, v in metrics[group].items():
+                    t[group][k] = t[group].get(k, 0) + v
+            self._last = metrics
+
+    def snapshot(self) -> dict:
+        """Totals across runs plus the most recent run's metrics."""
+        with self._lock:
+            return {
+                "runs": self._totals["runs"],
+                "errors": self._totals["errors"],
+                "stage_seconds": dict(self._totals["stage_seconds"]),
+                "counts": dict(self._totals["counts"]),
+                "cache": dict(self._totals["cache"]),
+                "last_run": self._last,
+            }
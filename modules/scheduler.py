@@ -0,0 +1,269 @@
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable
+from .io_utils import JsonlWriter, truncate_output
+from .settings import (
+    SCHED_ARTICLE_TIMEOUT, SCHED_MAX_MEMORY_MB, SCHED_MAX_TASKS_PER_CHILD,
+    SCHED_GRACE_SECONDS, SCHED_PROGRESS_SECONDS, SCHED_CHECKPOINT_EVERY
+)
+
+class ArticleTimeout(BaseException):
+    """
+    One article ran past the per-article time limit. A BaseException, so
+    the `except Exception` handlers inside the stages cannot swallow it.
+    """
+
+_worker = {}  # per-process state: the pipeline (inherited from the parent) and the limits
+
+def _on_alarm(signum, frame):
+    raise ArticleTimeout()
+
+def _limit_memory(max_mb):
+    """Cap this process's address space at its current size plus `max_mb` (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        return
+    limit = current + max_mb * 1024 * 1024
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _init_worker(pipeline, make_fetcher, timeout, max_memory_mb):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is handled by the parent
+    signal.signal(signal.SIGALRM, _on_alarm)
+    if make_fetcher is not None:
+        pipeline.fetcher = make_fetcher()  # sessions and SQLite handles must not cross a fork
+    _worker.update(pipeline=pipeline, timeout=timeout)
+    if max_memory_mb:
+        _limit_memory(max_memory_mb)
+
+def _process(seq, rec):
+    """Build one record's timeline in a worker; returns (seq, manifest entry, result, metrics)."""
+    pipeline = _worker["pipeline"]
+    timeout = _worker["timeout"]
+    entry = {"id": rec["id"], "url": rec["url"], "status": "done", "error": None}
+    result = metrics = None
+    t0 = time.perf_counter()
+    if rec.get("error"):  # unreadable input record
+        entry.update(status="error", error=rec["error"], seconds=0.0)
+        return seq, entry, result, metrics
+    try:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        if rec["text"] or not rec["url"]:
+            article = {"title": rec["title"] or rec["id"], "text": rec["text"],
+                       "published_at": None, "url": rec["url"]}
+            ctx = pipeline.run(article=article)
+        else:
+            ctx = pipeline.run(url=rec["url"])
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        if time.perf_counter() - t0 > timeout:  # the alarm was lost somewhere: the result may be partial
+            raise ArticleTimeout()
+        result, metrics = ctx["result"], ctx["metrics"]
+        entry["events"] = result["count"]
+    except ArticleTimeout:
+        entry.update(status="timeout", error=f"over {timeout}s")
+    except MemoryError:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        entry.update(status="memory", error="over the worker memory limit")
+    except Exception as e:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        entry.update(status="error", error=str(e) or type(e).__name__)
+    entry["seconds"] = round(time.perf_counter() - t0, 3)
+    return seq, entry, result, metrics
+
+def read_manifest(path: str):
+    """
+    Committed part of a checkpoint manifest: (latest entry per record id,
+    output sizes at the last checkpoint, byte size of the committed part).
+    Entries only count once the checkpoint line after them was written,
+    so whatever a crash left behind the last one is ignored.
+    """
+    entries, outputs, size = {}, {}, 0
+    if not Path(path).exists():
+        return entries, outputs, size
+    batch, offset = [], 0
+    with open(path, "rb") as f:
+        for line in f:
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:  # torn last line
+                break
+            if "checkpoint" in record:
+                entries.update((e["id"], e) for e in batch)
+                batch = []
+                outputs, size = record["outputs"], offset
+            else:
+                batch.append(record)
+    return entries, outputs, size
+
+def load_manifest(path: str) -> Dict[str, dict]:
+    """Latest committed manifest entry per record id (empty if there is no manifest yet)."""
+    return read_manifest(path)[0]
+
+class BatchScheduler:
+    """
+    Runs the pipeline over many batch records in a pool of forked
+    worker processes.
+
+    Each worker takes the next record as soon as it is free, so slow
+    articles never hold up a whole shard. An article that runs past
+    `timeout` seconds or grows the worker beyond `max_memory_mb` is
+    recorded as failed and the worker moves on; workers are replaced
+    after `max_tasks_per_child` articles. A worker that dies or hangs
+    where the alarm cannot reach it is noticed after the grace period:
+    its article is recorded as "lost" and the pool is restarted with
+    the other in-flight records re-queued.
+
+    Load the model (pipeline.warmup()) before run(): workers are forked
+    from this process and share it copy-on-write. `make_fetcher`, if
+    given, builds each worker's own fetcher.
+
+    With a `manifest`, finished records are appended to it as JSON lines
+    (id, url, status, error, events, seconds) every SCHED_CHECKPOINT_EVERY
+    records. `checkpoint()` is called first to make their outputs durable.
+    It returns {path: size} for the append-only outputs, and the sizes go
+    into a {"checkpoint", "outputs"} line that commits the entries before
+    it. On resume, read_manifest() gives the committed entries and sizes.
+    Cut the outputs back to those sizes with truncate_output() before
+    appending, so articles finished after the last checkpoint are redone
+    but not written twice. Records already in the manifest are skipped;
+    with `retry_failed`, only the ones that finished "done" are.
+    """
+
+    def __init__(self, pipeline, workers=None, make_fetcher=None, timeout=SCHED_ARTICLE_TIMEOUT,
+                 max_memory_mb=SCHED_MAX_MEMORY_MB, max_tasks_per_child=SCHED_MAX_TASKS_PER_CHILD,
+                 grace=SCHED_GRACE_SECONDS):
+        self.pipeline = pipeline
+        self.workers = workers or os.cpu_count() or 1
+        self.make_fetcher = make_fetcher
+        self.timeout = timeout
+        self.grace = grace
+        self.max_memory_mb = max_memory_mb
+        self.max_tasks_per_child = max_tasks_per_child
+
+    def _new_pool(self):
+        ctx = multiprocessing.get_context("fork")
+        return ctx.Pool(self.workers, initializer=_init_worker,
+                        initargs=(self.pipeline, self.make_fetcher, self.timeout, self.max_memory_mb),
+                        maxtasksperchild=self.max_tasks_per_child or None)
+
+    def run(self, records: Iterable[dict], on_result, checkpoint=None, manifest=None, retry_failed=False,
+            progress=None) -> dict:
+        """
+        Process every record not finished in `manifest`. `on_result(rec, result)`
+        runs in this process for each successful article, `progress(stats)`
+        every SCHED_PROGRESS_SECONDS. Returns the final stats.
+        """
+        seen, _, committed = read_manifest(manifest) if manifest else ({}, {}, 0)
+        skip = {i for i, e in seen.items() if e["status"] == "done" or not retry_failed}
+        todo, skipped = deque(), 0
+        for rec in records:
+            if rec["id"] in skip:
+                skipped += 1
+            else:
+                todo.append(rec)
+
+        started = time.monotonic()
+        stats = {"total": len(todo), "skipped": skipped, "done": 0, "failed": 0, "lost": 0,
+                 "restarts": 0, "elapsed": 0.0, "rate": 0.0, "eta": None}
+        if manifest:
+            truncate_output(manifest, committed)  # drop an uncommitted tail left by a crash
+        log = JsonlWriter(manifest, append=True) if manifest else None
+        finished = queue.SimpleQueue()
+        inflight = {}  # seq -> (record, submitted at)
+        pending = []   # manifest entries waiting for the next checkpoint
+        seq = 0
+        next_report = started + SCHED_PROGRESS_SECONDS
+
+        def finish(rec, entry, result=None, metrics=None):
+            if result is not None:
+                on_result(rec, result)
+                self.pipeline.record(metrics)
+                stats["done"] += 1
+            else:
+                stats["lost" if entry["status"] == "lost" else "failed"] += 1
+            pending.append(entry)
+            if len(pending) >= SCHED_CHECKPOINT_EVERY:
+                commit()
+
+        def commit():
+            outputs = checkpoint() if checkpoint else None
+            if log:
+                for entry in pending:
+                    log.write(entry)
+                log.write({"checkpoint": len(pending), "outputs": outputs or {}})
+                log.checkpoint()
+            pending.clear()
+
+        def report():
+            processed = stats["done"] + stats["failed"] + stats["lost"]
+            stats["elapsed"] = time.monotonic() - started
+            stats["rate"] = processed / stats["elapsed"] if stats["elapsed"] else 0.0
+            stats["eta"] = (stats["total"] - processed) / stats["rate"] if stats["rate"] else None
+            if progress:
+                progress(dict(stats))
+
+        pool = self._new_pool()
+        try:
+            while todo or inflight:
+                # One record per idle worker: whoever finishes first takes the next one
+                while todo and len(inflight) < self.workers:
+                    rec = todo.popleft()
+                    seq += 1
+                    inflight[seq] = (rec, time.monotonic())
+                    pool.apply_async(_process, (seq, rec), callback=finished.put,
+                                     error_callback=lambda e, s=seq, r=rec: finished.put(
+                                         (s, {"id": r["id"], "url": r["url"], "status": "error",
+                                              "error": str(e) or type(e).__name__}, None, None)))
+                try:
+                    done_seq, entry, result, metrics = finished.get(timeout=1)
+                except queue.Empty:
+                    pass
+                else:
+                    if done_seq in inflight:  # results from a pool that was restarted are dropped
+                        finish(inflight.pop(done_seq)[0], entry, result, metrics)
+                # Checked every time round, not only when results stop: the other
+                # workers can keep finishing while one of them is stuck
+                pool = self._reap_stale(pool, inflight, todo, finish, stats)
+                if progress and time.monotonic() >= next_report:
+                    report()
+                    next_report = time.monotonic() + SCHED_PROGRESS_SECONDS
+            commit()
+        except KeyboardInterrupt:
+            commit()  # keep what finished so far; the rest is picked up on resume
+            raise
+        finally:
+            pool.terminate()
+            pool.join()
+            if log:
+                log.close()
+        report()
+        return stats
+
+    def _reap_stale(self, pool, inflight, todo, finish, stats):
+        """Restart the pool if an in-flight record is well past its time limit."""
+        now = time.monotonic()
+        stale = [s for s, (_, t) in inflight.items() if now - t > self.timeout + self.grace]
+        if not stale:
+            return pool
+        pool.terminate()
+        pool.join()
+        for s in stale:
+            rec, t = inflight.pop(s)
+            finish(rec, {"id": rec["id"], "url": rec["url"], "status": "lost",
+                         "error": "worker died or stopped responding", "seconds": round(now - t, 3)})
+        todo.extendleft(rec for rec, _ in reversed(list(inflight.values())))
+        inflight.clear()
+        stats["restarts"] += 1
+        return self._new_pool()
@@ -1,9 +1,12 @@
 import re
 import json
-import requests
-from bs4 import BeautifulSoup
-from dateutil import parser as dateparser
+import codecs
+import threading
+from functools import lru_cache
+from html import unescape
+from io import BytesIO
 from urllib.parse import urlparse
+from .fetcher import ArticleFetcher
 
 # Clean junk HTML sections
 NOISE_SELECTORS = (
@@ -12,70 +15,223 @@ NOISE_SELECTORS = (
     ".storyTags, .topnav, .breadcrumb, .liveblog, .next-article, .pagination, .paywall"
 )
 
+# Article body candidates, best first
+BODY_SELECTORS = ["article", "div[itemprop='articleBody']", ".Normal"]
+
+# Byte-level scanners: JSON-LD and <title> are found without building a tree
+JSON_LD_RE = re.compile(
+    rb"<script[^>]*\btype\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>", re.I | re.S
+)
+TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title\s*>", re.I | re.S)
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([A-Za-z0-9_.:-]+)", re.I)
+
+SELECTOR_RE = re.compile(r"^(?P<tag>[a-z0-9]+)?(?:\.(?P<cls>[\w-]+))?(?:\[(?P<attr>[\w-]+)=['\"]?(?P<val>[^'\"\]]*)['\"]?\])?$")
+
+def _compile_selector(selector: str):
+    """Match function for the simple `tag`, `.class` and `[attr='v']` selectors used here."""
+    m = SELECTOR_RE.match(selector.strip())
+    if not m:
+        raise ValueError(f"Unsupported selector: {selector}")
+    tag, cls, attr, val = m.group("tag", "cls", "attr", "val")
+
+    def matches(el) -> bool:
+        if not isinstance(el.tag, str):  # comments, processing instructions
+            return False
+        if tag and el.tag.lower() != tag:
+            return False
+        if cls and cls not in (el.get("class") or "").split():
+            return False
+        if attr and el.get(attr) != val:
+            return False
+        return True
+    return matches
+
+NOISE_MATCHERS = [_compile_selector(s) for s in NOISE_SELECTORS.split(",") if s.strip()]
+BODY_MATCHERS = [_compile_selector(s) for s in BODY_SELECTORS]
+
 def _clean_text(text):
     return re.sub(r"\s+", " ", text or "").strip()
 
-def _extract_json_ld(soup):
+def _page_encoding(content: bytes, declared=None) -> str:
+    """
+    Declared HTTP charset, else the page's <meta charset>, else UTF-8.
+    The declared (IANA) name is kept: lxml does not know Python's codec
+    aliases such as "euc_kr".
+    """
+    candidates = [declared]
+    m = META_CHARSET_RE.search(content, 0, 4096)
+    if m:
+        candidates.append(m.group(1).decode("ascii"))
+    for enc in candidates:
+        if enc:
+            try:
+                codecs.lookup(enc)
+                return enc.strip().lower()
+            except LookupError:
+                continue
+    return "utf-8"
+
+def _extract_json_ld(content: bytes, encoding: str):
     """Extract clean text + title from TOI JSON-LD if available."""
-    blocks = soup.find_all("script", {"type": "application/ld+json"})
     article_body = None
     title = None
     publish_date = None
 
-    for b in blocks:
+    for m in JSON_LD_RE.finditer(content):
         try:
-            data = json.loads(b.string.strip())
+            data = json.loads(m.group(1).decode(encoding, errors="replace").strip())
             if isinstance(data, dict) and data.get("@type") == "NewsArticle":
                 article_body = data.get("articleBody")
                 title = data.get("headline")
                 publish_date = data.get("datePublished")
                 break
-        except:
+        except ValueError:
             continue
 
     return title, article_body, publish_date
 
-def _fallback_text(soup):
-    """Fallback if JSON-LD is not available."""
-    for selector in ["article", "div[itemprop='articleBody']", ".Normal"]:
-        tag = soup.select_one(selector)
-        if tag:
-            return tag.get_text(separator=" ")
-    return ""
+def _extract_title(content: bytes, encoding: str):
+    m = TITLE_RE.search(content)
+    if not m:
+        return None
+    return unescape(m.group(1).decode(encoding, errors="replace")).strip() or None
 
-def fetch_article(url):
+def _drop(el):
+    """Remove an element but keep its tail text in place."""
+    parent = el.getparent()
+    if parent is None:
+        return
+    if el.tail:
+        prev = el.getprevious()
+        if prev is not None:
+            prev.tail = (prev.tail or "") + el.tail
+        else:
+            parent.text = (parent.text or "") + el.tail
+    parent.remove(el)
+
+@lru_cache(maxsize=None)
+def _lxml_knows(encoding: str) -> bool:
+    from lxml import etree
+    try:
+        etree.HTMLParser(encoding=encoding)
+        return True
+    except LookupError:
+        return False
+
+def _fallback_text(content: bytes, encoding: str):
+    """
+    Fallback if JSON-LD is not available.
+    Streams the page through lxml and stops at the end of the first
+    <article>; noise nodes inside the chosen body are stripped.
+    """
+    from lxml import etree
+    best, best_rank = None, len(BODY_MATCHERS)
+    if not _lxml_knows(encoding):  # a charset Python decodes but libxml2 does not
+        content, encoding = content.decode(encoding, errors="replace").encode("utf-8"), "utf-8"
+    try:
+        for event, el in etree.iterparse(BytesIO(content), events=("start", "end"), html=True,
+                                         encoding=encoding, recover=True):
+            if event == "start":
+                if best_rank == 0:
+                    continue
+                for rank, matches in enumerate(BODY_MATCHERS[:best_rank]):
+                    if matches(el):
+                        best, best_rank = el, rank
+                        break
+            elif el is best and best_rank == 0:
+                break
+    except etree.LxmlError:
+        pass
+    if best is None:
+        return ""
+
+    for el in [e for e in best.iterdescendants() if not isinstance(e.tag, str) or any(m(e) for m in NOISE_MATCHERS)]:
+        _drop(el)
+    return " ".join(best.itertext())
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher() -> ArticleFetcher:
+    """Shared pooled fetcher used when callers don't pass their own."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ArticleFetcher()
+        return _fetcher
+
+def set_fetcher(fetcher: ArticleFetcher):
+    """Replace the shared fetcher (e.g. with a fixtures-backed one)."""
+    global _fetcher
+    with _fetcher_lock:
+        _fetcher = fetcher
+
+def fetch_article(url, fetcher=None):
     """Main article fetcher."""
-    headers = {"User-Agent": "Mozilla/5.0 (TimelineExtractor/4.3)"}
-    res = requests.get(url, headers=headers, timeout=20)
-    soup = BeautifulSoup(res.text, "lxml")
+    fetcher = fetcher or get_fetcher()
+    return _parse_with_cache(fetcher.fetch(url), fetcher.cache)
+
+def fetch_articles(urls, fetcher=None):
+    """Fetch and parse many articles concurrently; yields (url, article, error) in input order."""
+    fetcher = fetcher or get_fetcher()
+    for url, page, error in fetcher.fetch_many(urls):
+        if error is not None:
+            yield url, None, error
+            continue
+        try:
+            yield url, _parse_with_cache(page, fetcher.cache), None
+        except Exception as e:
+            yield url, None, e
+
+def _parse_with_cache(page, cache):
+    """Reuse the extracted article stored for this exact page content."""
+    if cache is None:
+        return parse_article_page(page)
+    article = cache.get_article(page["url"], page["content_hash"])
+    if article is None:
+        article = parse_article_page(page)
+        cache.put_article(page["url"], page["content_hash"], article)
+    return article
+
+def parse_article_page(page):
+    """Extract title, text and publish date from a fetched page."""
+    return parse_article_html(page["content"], page["url"], page.get("encoding"))
+
+def parse_article_html(html, url, encoding=None):
+    """Extract title, text and publish date from raw article HTML (bytes or str)."""
+    if isinstance(html, str):
+        html, encoding = html.encode("utf-8"), "utf-8"
+    encoding = _page_encoding(html, encoding)
+    page_title = _extract_title(html, encoding)
 
     domain = urlparse(url).netloc.lower()
     is_toi = "timesofindia" in domain
 
     # Use JSON-LD for TOI (clean source)
     if is_toi:
-        title, body, date_published = _extract_json_ld(soup)
+        title, body, date_published = _extract_json_ld(html, encoding)
         if not body:
-            body = _fallback_text(soup)
+            body = _fallback_text(html, encoding)
 
         publish_date = None
         if date_published:
+            from dateutil import parser as dateparser
             try:
                 publish_date = dateparser.parse(date_published)
-            except:
+            except (ValueError, OverflowError, TypeError):
                 pass
 
         return {
-            "title": title or soup.title.string.strip(),
+            "title": title or page_title or url,
             "text": _clean_text(body),
             "published_at": publish_date,
             "url": url
         }
 
     # If not TOI, fallback parsing (generic mode)
-    body = _fallback_text(soup)
+    body = _fallback_text(html, encoding)
     return {
-        "title": soup.title.string.strip() if soup.title else url,
+        "title": page_title or url,
         "text": _clean_text(body),
         "published_at": None,
         "url": url
@@ -31,3 +31,73 @@ SCORE_HEADLINE_BONUS = 2.0
 SCORE_VERB_WEIGHT = 0.8
 SCORE_PROPN_WEIGHT = 0.6
 SCORE_LEN_CAP = 1.5
+SCORE_LEN_UNIT = 20       # tokens per point of the (capped) length score
+
+# spaCy
+SPACY_MODEL = "en_core_web_sm"
+SPACY_BATCH_SIZE = 32   # docs per nlp.pipe batch in batch mode
+SPACY_N_PROCESS = 1     # worker processes for nlp.pipe
+
+# spaCy pipeline profile: only sentences (parser) and DATE entities (ner) are used
+#   full   - every default component
+#   lean   - skip tagger, attribute_ruler and lemmatizer (same output as full)
+#   senter - lean, with the faster `senter` instead of the dependency parser
+#   regex  - lean without NER; NER only runs when regex found too few dates
+#   rank   - lean plus tagger/attribute_ruler, for the POS features of event ranking
+SPACY_PROFILE = "lean"
+SPACY_PROFILES = {
+    "full":   {"disable": [], "enable": []},
+    "lean":   {"disable": ["tagger", "attribute_ruler", "lemmatizer"], "enable": []},
+    "senter": {"disable": ["tagger", "attribute_ruler", "lemmatizer", "parser"], "enable": ["senter"]},
+    "regex":  {"disable": ["tagger", "attribute_ruler", "lemmatizer", "ner"], "enable": []},
+    "rank":   {"disable": ["lemmatizer"], "enable": []},
+}
+NER_MIN_REGEX_DATES = 2  # regex profile: skip NER once this many regex dates are found
+
+# Date normalization
+DATE_CACHE_SIZE = 8192  # LRU entries for parsed date surfaces
+
+# Fetching
+FETCH_USER_AGENT = "Mozilla/5.0 (TimelineExtractor/4.3)"
+FETCH_TIMEOUT = 20          # seconds per request
+FETCH_RETRIES = 3           # retries on connection errors and 429/5xx
+FETCH_BACKOFF = 0.5         # backoff factor, doubled per retry
+FETCH_MAX_WORKERS = 8       # concurrent fetches in fetch_many
+FETCH_PER_HOST_LIMIT = 2    # concurrent requests per host
+FETCH_REMEMBER_PAGES = 256  # pages kept in memory for ETag/Last-Modified revalidation
+
+# On-disk article cache (raw HTML + extracted article)
+ARTICLE_CACHE_PATH = ".cache/articles.sqlite"
+ARTICLE_CACHE_TTL = 6 * 3600                # seconds a page is served without revalidating
+ARTICLE_CACHE_MAX_AGE = 30 * 24 * 3600      # entries older than this are evicted
+ARTICLE_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # compressed size cap, least recently used go first
+
+# Web job queue
+JOB_MAX_WORKERS = 4       # timelines built concurrently by app.py
+JOB_KEEP_SECONDS = 600    # finished jobs stay pollable this long
+JOB_TIMEOUT_SECONDS = 300  # a job still pending this long after submission is failed
+
+# Timeline store (indexed archive of every extracted event)
+TIMELINE_STORE_PATH = "data/timelines.sqlite"
+TIMELINE_QUERY_LIMIT = 500  # default max rows returned by app.py /api/events
+TIMELINE_STORE_BATCH = 200  # batch mode: results per bulk insert
+
+# Sharded batch runs (main.py --batch --workers N)
+SCHED_ARTICLE_TIMEOUT = 120       # seconds one article may take in a worker, fetch included
+SCHED_MAX_MEMORY_MB = 2048        # address space a worker may grow by beyond the forked model (0 = no cap)
+SCHED_MAX_TASKS_PER_CHILD = 500   # articles before a worker is replaced by a fresh fork
+SCHED_GRACE_SECONDS = 30          # past the timeout, a silent worker is presumed dead and its pool restarted
+SCHED_PROGRESS_SECONDS = 5        # interval between progress reports
+SCHED_CHECKPOINT_EVERY = 50       # finished articles per output flush + manifest append
+
+# Pipeline
+EVENT_WINDOW = 1          # context sentences on each side of a dated sentence
+LIST_MIN_ITEMS = 3        # bullet/numbered items needed to treat an article as a list
+EVENT_TOP_K = 0           # keep the best K events per date/year bucket (0 = keep all)
+EVENT_BUDGET = 0          # keep at most this many events per article (0 = no limit)
+
+# Cross-article merge (MinHash near-duplicate detection)
+MERGE_NUM_PERM = 64       # MinHash signature length
+MERGE_BANDS = 16          # LSH bands (MERGE_NUM_PERM / MERGE_BANDS rows each)
+MERGE_THRESHOLD = 0.5     # estimated Jaccard similarity to treat two events as the same
+MERGE_SHINGLE_WORDS = 3   # word n-gram size for shingles
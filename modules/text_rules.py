@@ -0,0 +1,72 @@
+import importlib
+import re
+from typing import Iterable, List
+from . import settings
+
+NEVER_RE = re.compile(r"(?!)")
+
+def phrase_pattern(phrases: Iterable[str]) -> str:
+    """
+    Regex source matching any of `phrases`, factored into a trie so each
+    position only tries the branches that share its first character.
+    A phrase that is a prefix of another ends the branch (any match is enough).
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        if "" in node:
+            return ""
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return build(trie) if trie else NEVER_RE.pattern
+
+class TextRules:
+    """
+    The sentence-filter and summary-trimming rule sets from settings,
+    compiled once:
+
+    - IGNORE_IF_CONTAINS  -> one trie regex, searched on the lowercased sentence
+    - DROP_SENTENCE_IF_MATCHES -> one alternation, fullmatched on the stripped sentence
+    - TRIM_AFTER_TOKENS   -> one trie regex; text is cut at the earliest marker
+    """
+
+    def __init__(self, cfg=settings):
+        self.ignore_re = re.compile(phrase_pattern({p.lower() for p in cfg.IGNORE_IF_CONTAINS}))
+        drop = "|".join(f"(?:{p})" for p in cfg.DROP_SENTENCE_IF_MATCHES)
+        self.drop_re = re.compile(drop, re.IGNORECASE) if drop else NEVER_RE
+        self.trim_re = re.compile(phrase_pattern(cfg.TRIM_AFTER_TOKENS))
+        self.min_len = cfg.MIN_EVENT_LEN_CHARS
+        self.max_len = cfg.MAX_EVENT_LEN_CHARS
+
+    def keep(self, sentence: str) -> bool:
+        """Same decision as the original per-phrase/per-pattern checks."""
+        if self.ignore_re.search(sentence.lower()):
+            return False
+        if self.drop_re.fullmatch(sentence.strip()):
+            return False
+        return len(sentence) >= self.min_len
+
+    def keep_many(self, sentences: List[str]) -> List[bool]:
+        ignore, drop, min_len = self.ignore_re.search, self.drop_re.fullmatch, self.min_len
+        return [len(s) >= min_len and not ignore(s.lower()) and not drop(s.strip()) for s in sentences]
+
+    def trim(self, text: str) -> str:
+        m = self.trim_re.search(text)
+        return text[:m.start()] if m else text
+
+_rules = TextRules()
+
+def get_rules() -> TextRules:
+    return _rules
+
+def reload_rules() -> TextRules:
+    """Re-read modules/settings.py and recompile the rules; running code picks them up on next use."""
+    global _rules
+    _rules = TextRules(importlib.reload(settings))
+    return _rules
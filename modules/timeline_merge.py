@@ -0,0 +1,114 @@
+import re
+import zlib
+import numpy as np
+from typing import Dict, Iterable, List
+from .settings import MERGE_NUM_PERM, MERGE_BANDS, MERGE_THRESHOLD, MERGE_SHINGLE_WORDS
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+_SEED = 20240601
+
+def _shingles(text: str, n: int = MERGE_SHINGLE_WORDS):
+    words = WORD_RE.findall((text or "").lower())
+    if len(words) <= n:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+def _bucket(row: Dict):
+    """Events are only compared within the same date (or year, or undated) bucket."""
+    if row.get("date"):
+        return ("date", row["date"])
+    if row.get("year"):
+        return ("year", row["year"])
+    return ("none", None)
+
+def _sort_key(row):
+    bucket, value = _bucket(row)
+    return {"date": (0, value), "year": (1, str(value)), "none": (2, "")}[bucket]
+
+class TimelineMerger:
+    """
+    Builds one story timeline from many per-article timelines.
+
+    Each event gets a MinHash signature of its word shingles. The
+    signature's LSH bands are indexed per date bucket, so a new event is
+    only compared with the few clusters that share a band in its bucket.
+    A match above `threshold` joins that cluster (adding its source);
+    otherwise the event starts a new cluster. Cost grows linearly with the
+    number of events instead of pairwise.
+    """
+
+    def __init__(self, num_perm=MERGE_NUM_PERM, bands=MERGE_BANDS, threshold=MERGE_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(_SEED)
+        # Multiply-shift hash family: ((a * x + b) mod 2**64) >> 32
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.rows_per_band = num_perm // bands
+        self.bands = bands
+        self.threshold = threshold
+        self.clusters = []  # {"row", "signature", "sources", "source_keys"}
+        self._index = {}    # (bucket, band, band bytes) -> [cluster ids]
+        self._exact = {}    # (bucket, normalized text) -> cluster id
+
+    def _signature(self, shingles) -> np.ndarray:
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        with np.errstate(over="ignore"):
+            hashed = (self._a[:, None] * x[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+    def _band_keys(self, bucket, sig):
+        r = self.rows_per_band
+        return [(bucket, i, sig[i * r:(i + 1) * r].tobytes()) for i in range(self.bands)]
+
+    def add_row(self, row: Dict, source: Dict):
+        """Add one exported timeline row ({date, year, event, matched_phrase}) from `source`."""
+        bucket = _bucket(row)
+        text = " ".join(WORD_RE.findall((row.get("event") or "").lower()))
+        cid = self._exact.get((bucket, text))
+        if cid is None:
+            shingles = _shingles(text)
+            if shingles:
+                sig = self._signature(shingles)
+                keys = self._band_keys(bucket, sig)
+                cid = self._best_match(keys, sig)
+            if cid is None:
+                cid = len(self.clusters)
+                self.clusters.append({"row": dict(row), "signature": sig if shingles else None, "sources": [],
+                                      "source_keys": set()})
+                if shingles:
+                    for key in keys:
+                        self._index.setdefault(key, []).append(cid)
+            self._exact[(bucket, text)] = cid
+        cluster = self.clusters[cid]
+        source_key = (source.get("url"), source.get("title"))
+        if source_key not in cluster["source_keys"]:  # set lookup: widely reported events stay linear
+            cluster["source_keys"].add(source_key)
+            cluster["sources"].append(source)
+
+    def _best_match(self, keys, sig):
+        candidates = {cid for key in keys for cid in self._index.get(key, ())}
+        best, best_sim = None, self.threshold
+        for cid in candidates:
+            sim = float(np.mean(self.clusters[cid]["signature"] == sig))
+            if sim >= best_sim:
+                best, best_sim = cid, sim
+        return best
+
+    def add_timeline(self, result: Dict):
+        """Add every row of one article's timeline (the JSON written by main.py)."""
+        source = {"url": result.get("source_url"), "title": result.get("source_title")}
+        for row in result.get("timeline", []):
+            self.add_row(row, source)
+
+    def rows(self) -> List[Dict]:
+        """Merged rows, chronologically sorted, each with its sources."""
+        merged = [dict(c["row"], sources=c["sources"], source_count=len(c["sources"])) for c in self.clusters]
+        return sorted(merged, key=_sort_key)
+
+def merge_timelines(results: Iterable[Dict], **kwargs) -> List[Dict]:
+    """Merge many per-article timelines into one story timeline."""
+    merger = TimelineMerger(**kwargs)
+    for result in results:
+        merger.add_timeline(result)
+    return merger.rows()
@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+from .settings import TIMELINE_STORE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id             INTEGER PRIMARY KEY,
+    key            TEXT UNIQUE,
+    url            TEXT,
+    title          TEXT,
+    reference_date TEXT,
+    stored_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id             INTEGER PRIMARY KEY,
+    article_id     INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+    date           TEXT,
+    year           INTEGER,
+    year_only      INTEGER NOT NULL,
+    event          TEXT NOT NULL,
+    matched_phrase TEXT,
+    phrase_key     TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_url ON articles (url);
+CREATE INDEX IF NOT EXISTS events_date ON events (date);
+CREATE INDEX IF NOT EXISTS events_year ON events (year);
+CREATE INDEX IF NOT EXISTS events_article ON events (article_id);
+CREATE INDEX IF NOT EXISTS events_phrase ON events (phrase_key);
+"""
+
+def _phrase_key(phrase):
+    return " ".join(phrase.lower().split()) if phrase else None
+
+def _event_values(article_id, row):
+    """events columns for one to_export_rows row; `year` is filled from the date too."""
+    date = row.get("date")
+    year = int(date[:4]) if date else row.get("year")
+    return (article_id, date, year, 0 if date else 1, row["event"],
+            row.get("matched_phrase"), _phrase_key(row.get("matched_phrase")))
+
+class TimelineStore:
+    """
+    SQLite archive of exported timeline rows across every processed article.
+
+    Rows are indexed by date, year, source and normalized matched phrase,
+    so "all events between two dates" is an index range scan instead of a
+    pass over every JSON file. Storing an article again (same URL, or same
+    batch id for text inputs) replaces its rows.
+    """
+
+    def __init__(self, path=TIMELINE_STORE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+
+    def _insert(self, result: Dict):
+        url = result.get("source_url")
+        key = url or result.get("id")
+        if key is not None:
+            self._db.execute("DELETE FROM articles WHERE key = ?", (key,))
+        cur = self._db.execute(
+            "INSERT INTO articles (key, url, title, reference_date, stored_at) VALUES (?, ?, ?, ?, ?)",
+            (key, url, result.get("source_title"), result.get("reference_date"), time.time()))
+        article_id = cur.lastrowid
+        rows = result.get("timeline", [])
+        self._db.executemany(
+            "INSERT INTO events (article_id, date, year, year_only, event, matched_phrase, phrase_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", (_event_values(article_id, row) for row in rows))
+        return len(rows)
+
+    def add_timeline(self, result: Dict) -> int:
+        """Store one timeline result (source_url or id, source_title, timeline rows)."""
+        return self.add_many([result])
+
+    def add_many(self, results: Iterable[Dict]) -> int:
+        """Bulk-insert many results in one transaction; returns the number of rows stored."""
+        with self._lock, self._db:
+            return sum(self._insert(result) for result in results)
+
+    def query(self, start=None, end=None, year=None, source_url=None, phrase=None, limit=None):
+        """
+        Yield rows matching every given filter, in timeline order.
+        `start`/`end` are inclusive YYYY-MM-DD bounds on dated events;
+        `year` also matches dated events in that year.
+        """
+        where, params = [], []
+        if start:
+            where.append("e.date >= ?")
+            params.append(start)
+        if end:
+            where.append("e.date <= ?")
+            params.append(end)
+        if year is not None:
+            where.append("e.year = ?")
+            params.append(int(year))
+        if source_url:
+            where.append("a.url = ?")
+            params.append(source_url)
+        if phrase:
+            where.append("e.phrase_key = ?")
+            params.append(_phrase_key(phrase))
+        sql = ("SELECT e.date, e.year, e.year_only, e.event, e.matched_phrase, a.url, a.title "
+               "FROM events e JOIN articles a ON a.id = e.article_id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.date IS NULL, e.date, e.year IS NULL, e.year, e.id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            cur = self._db.execute(sql, params)
+        while True:
+            with self._lock:
+                batch = cur.fetchmany(500)
+            if not batch:
+                return
+            for date, year, year_only, event, phrase_, url, title in batch:
+                yield {"date": date, "year": year if year_only else None, "event": event,
+                       "matched_phrase": phrase_, "source_url": url, "source_title": title}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            articles = self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            events = self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        return {"articles": articles, "events": events}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+import spacy
+
+import modules.nlp_models as nlp_models
+from modules.date_extractor import clear_date_cache, normalize_absolute_date, scan_date_mentions
+from modules.settings import SPACY_MODEL
+
+@pytest.fixture
+def blank_model(monkeypatch):
+    nlp = spacy.blank("en")
+    monkeypatch.setitem(nlp_models._MODELS, (SPACY_MODEL, nlp_models._profile), nlp)
+    return nlp
+
+def test_missing_year_comes_from_the_reference_date():
+    clear_date_cache()
+    assert normalize_absolute_date("March 3", ref_date=datetime(2019, 6, 1)) == datetime(2019, 3, 3)
+    assert normalize_absolute_date("March 3", ref_date=datetime(2021, 6, 1)) == datetime(2021, 3, 3)
+
+def test_fully_specified_dates_ignore_the_reference_date():
+    assert normalize_absolute_date("3 March 2024", ref_date=datetime(2000, 1, 1)) == datetime(2024, 3, 3)
+
+def test_bare_weekday_is_resolved_against_the_reference_date(blank_model):
+    ref = datetime(2024, 3, 8)  # a Friday
+    text = "The deal was signed on 3 March 2024 and announced on 5 March 2024, the minister said Tuesday."
+    doc = blank_model(text)  # no NER: the regex profile stops after NER_MIN_REGEX_DATES scanner dates
+    found = {m["surface"]: m["normalized"] for m in scan_date_mentions(text, ref, doc)}
+    assert found["Tuesday"] == datetime(2024, 3, 5)
+    assert {m["surface"] for m in scan_date_mentions("Talks resume Wednesday, March 6, 2024.", ref, doc)} == {
+        "March 6, 2024"}
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+import spacy
+
+import modules.nlp_models as nlp_models
+from modules.incremental import IncrementalTimeline
+from modules.pipeline import TimelinePipeline
+from modules.settings import SPACY_MODEL
+from modules.timeline_builder import to_export_rows
+
+REF = datetime(2025, 1, 1)
+
+DATED = ("On 3 March 2024 the council voted to approve the new transport plan after a long debate. "
+         "Residents said the plan had been discussed for years without any real progress being made. "
+         "Several members warned that the budget would not cover the full cost of the project. "
+         "The opposition asked for an independent review of the financial estimates before any work. "
+         "Officials said they expected the first contracts to be signed within the next few months. ")
+HEADLINE = "Mayor Responds To Angry Critics At Packed Town Hall!"
+
+@pytest.fixture(autouse=True)
+def blank_model(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setitem(nlp_models._MODELS, (SPACY_MODEL, nlp_models._profile), nlp)
+
+def _rows(rows):
+    return sorted((r["date"] or "", r["year"] or 0, r["event"]) for r in rows)
+
+def _full(text):
+    article = {"title": "T", "text": text, "published_at": REF, "url": None}
+    return _rows(TimelinePipeline(window=1).run(article=article)["result"]["timeline"])
+
+def _incremental(*versions):
+    state = IncrementalTimeline(None, REF, window=1)
+    for text in versions:
+        state = IncrementalTimeline.from_state(state.to_state())
+        state.update(text)
+    return _rows(to_export_rows(state.timeline()))
+
+def test_appended_headline_pairs_with_a_date_outside_the_parsed_chunk():
+    text = DATED + HEADLINE
+    rows = _incremental(DATED, text)
+    assert rows == _full(text)
+    assert len(rows) > len(_incremental(DATED))  # the headline's event is there
+
+def test_new_date_re_pairs_an_earlier_headline():
+    head = HEADLINE + " " + DATED.split(". ", 1)[1]
+    late = "Work finally started on 5 May 2024 after the contracts had been signed by the city. "
+    assert _incremental(head + "Filler.", head + late) == _full(head + late)
+
+def test_removed_date_re_pairs_its_headline():
+    late = "Work finally started on 5 May 2024 after the contracts had been signed by the city. "
+    text = DATED + HEADLINE + " Some more words about nothing in particular were added here."
+    assert _incremental(text + " " + late, text) == _full(text)
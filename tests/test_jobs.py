@@ -0,0 +1,46 @@
+import os
+import time
+
+from modules.jobs import JobQueue
+
+def _wait(jobs, job_id, seconds=10):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] != "pending":
+            return job
+        time.sleep(0.05)
+    return job
+
+def test_dead_worker_is_replaced_from_the_fork_server():
+    jobs = JobQueue(max_workers=2, processes=True)
+    try:
+        crash = jobs.submit("crash", os._exit, 1)
+        assert _wait(jobs, crash["id"])["status"] == "error"
+        job = _wait(jobs, jobs.submit("pid", os.getpid)["id"])
+        assert job["status"] == "done" and job["result"] != os.getpid()
+        assert jobs._pool._mp_context.get_start_method() == "forkserver"
+    finally:
+        jobs.shutdown()
+
+def test_job_past_its_deadline_fails_and_frees_the_worker():
+    jobs = JobQueue(max_workers=1, processes=True, timeout=1)
+    try:
+        slow = jobs.submit("slow", time.sleep, 30)
+        job = _wait(jobs, slow["id"])
+        assert job["status"] == "error" and "timed out" in job["error"]
+        assert _wait(jobs, jobs.submit("next", os.getpid)["id"], seconds=3)["status"] == "done"
+    finally:
+        jobs.shutdown()
+
+def test_late_result_does_not_overwrite_a_timed_out_thread_job():
+    jobs = JobQueue(max_workers=1, timeout=0.5)
+    try:
+        slow = jobs.submit("slow", lambda: time.sleep(1) or "late")
+        assert _wait(jobs, slow["id"])["status"] == "error"
+        time.sleep(1)
+        assert jobs.get(slow["id"])["status"] == "error"
+        again = jobs.submit("slow", lambda: "fresh")  # the key is free again
+        assert again["id"] != slow["id"] and _wait(jobs, again["id"])["result"] == "fresh"
+    finally:
+        jobs.shutdown()
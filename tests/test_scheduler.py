@@ -0,0 +1,192 @@
+import http.server
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+import spacy
+
+import modules.nlp_models as nlp_models
+import modules.scheduler as scheduler
+from modules.fetcher import ArticleFetcher
+from modules.io_utils import JsonlWriter, truncate_output, iter_batch_inputs, iter_jsonl
+from modules.pipeline import TimelinePipeline
+from modules.scheduler import BatchScheduler, read_manifest
+from modules.settings import SPACY_MODEL
+
+PAGE = ("<html><head><title>{slug}</title></head><body><article>"
+        "<p>On 3 March 2024 the council of {slug} voted to approve the new transport plan after a long debate.</p>"
+        "<p>Construction is expected to begin on 5 May 2024 once the contracts have been signed.</p>"
+        "</article></body></html>")
+
+@pytest.fixture(autouse=True)
+def blank_model(monkeypatch):
+    """A blank English pipeline with a sentencizer stands in for the full model."""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setitem(nlp_models._MODELS, (SPACY_MODEL, nlp_models._profile), nlp)
+
+@pytest.fixture
+def site():
+    """Local HTTP stand-in: /missing* is a 404, any other path an article page. Counts hits per path."""
+    hits = {}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            if self.path.startswith("/missing"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = PAGE.format(slug=self.path.strip("/")).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", hits
+    server.shutdown()
+
+def _text(rec_id, text):
+    return {"id": rec_id, "url": None, "title": rec_id, "text": text}
+
+def _url(rec_id):
+    return {"id": rec_id, "url": f"https://news.example.com/{rec_id}", "title": None, "text": None}
+
+def _with_stage(fn):
+    pipeline = TimelinePipeline()
+    pipeline.insert_stage("fetch", "test", fn)
+    return pipeline
+
+ARTICLE = "On 3 March 2024 the council voted to approve the new transport plan after a long debate."
+
+def test_timeout_is_not_swallowed_by_stage_handlers():
+    def slow(pipeline, ctx):
+        if ctx["text"].startswith("SLOW"):
+            try:
+                time.sleep(6)
+            except Exception:  # broad handlers inside stages must not hide the timeout
+                pass
+
+    results = {}
+    stats = BatchScheduler(_with_stage(slow), workers=2, timeout=1).run(
+        [_text("slow", "SLOW " + ARTICLE), _text("ok", ARTICLE)],
+        on_result=lambda rec, result: results.setdefault(rec["id"], result))
+    assert stats["done"] == 1 and stats["failed"] == 1
+    assert set(results) == {"ok"}
+
+def test_lost_worker_is_recorded_and_the_rest_finish(tmp_path):
+    def die(pipeline, ctx):
+        if ctx["text"].startswith("DIE"):
+            os._exit(1)
+
+    manifest = str(tmp_path / "manifest.jsonl")
+    records = [_text("dies", "DIE " + ARTICLE)] + [_text(f"ok{i}", ARTICLE) for i in range(5)]
+    stats = BatchScheduler(_with_stage(die), workers=2, timeout=1, grace=1).run(
+        records, on_result=lambda rec, result: None, manifest=manifest)
+    entries = read_manifest(manifest)[0]
+    assert entries["dies"]["status"] == "lost"
+    assert all(entries[f"ok{i}"]["status"] == "done" for i in range(5))
+    assert stats["lost"] == 1 and stats["done"] == 5 and stats["restarts"] >= 1
+
+def test_stuck_worker_is_reaped_while_others_keep_finishing(tmp_path):
+    def stage(pipeline, ctx):
+        if ctx["text"].startswith("HANG"):
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})  # out of the alarm's reach
+            time.sleep(30)
+        time.sleep(0.3)
+
+    manifest = str(tmp_path / "manifest.jsonl")
+    records = [_text("hung", "HANG " + ARTICLE)] + [_text(f"ok{i}", ARTICLE) for i in range(20)]
+    BatchScheduler(_with_stage(stage), workers=2, timeout=1, grace=1).run(
+        records, on_result=lambda rec, result: None, manifest=manifest)
+    entries = read_manifest(manifest)[0]
+    assert entries["hung"]["status"] == "lost"
+    assert entries["hung"]["seconds"] < 4  # not only once the other worker ran out of records
+    assert all(entries[f"ok{i}"]["status"] == "done" for i in range(20))
+
+def test_resume_skips_committed_articles_and_drops_uncommitted_output(tmp_path, site, monkeypatch):
+    base_url, hits = site
+    monkeypatch.setattr(scheduler, "SCHED_CHECKPOINT_EVERY", 3)
+    manifest, out = str(tmp_path / "manifest.jsonl"), str(tmp_path / "out.jsonl")
+    records = [_url(f"story-{i}") for i in range(10)]
+
+    def run(crash_after=None):
+        done, sizes, _ = read_manifest(manifest)
+        if done and out in sizes:
+            truncate_output(out, sizes[out])
+        writer = JsonlWriter(out, append=bool(done))
+        written = []
+
+        def on_result(rec, result):
+            if crash_after is not None and len(written) == crash_after:
+                raise RuntimeError("crash")
+            writer.write(dict(result, id=rec["id"]))
+            written.append(rec["id"])
+
+        try:
+            return BatchScheduler(TimelinePipeline(), workers=2,
+                                  make_fetcher=lambda: ArticleFetcher(base_url=base_url)).run(
+                records, on_result, checkpoint=lambda: {out: writer.checkpoint()}, manifest=manifest)
+        finally:
+            writer.close()
+
+    with pytest.raises(RuntimeError):
+        run(crash_after=7)  # 6 committed, the 7th written after the last checkpoint
+    assert len(list(iter_jsonl(out))) == 7
+    assert len(read_manifest(manifest)[0]) == 6
+
+    stats = run()
+    assert stats["skipped"] == 6 and stats["done"] == 4
+    ids = [row["id"] for row in iter_jsonl(out)]
+    assert sorted(ids) == sorted(rec["id"] for rec in records)  # every article exactly once
+    committed = set(read_manifest(manifest)[0])
+    assert committed == {rec["id"] for rec in records}
+
+def test_unreadable_input_records_fail_alone(tmp_path):
+    batch = tmp_path / "batch.jsonl"
+    batch.write_text("\n".join([json.dumps({"id": "a", "text": ARTICLE}), "{not json", "[1, 2]",
+                                 json.dumps({"id": "n", "text": 42}), json.dumps({"id": "b", "text": ARTICLE})]))
+    manifest = str(tmp_path / "manifest.jsonl")
+    stats = BatchScheduler(TimelinePipeline(), workers=2).run(
+        iter_batch_inputs(str(batch)), on_result=lambda rec, result: None, manifest=manifest)
+    assert stats["done"] == 2 and stats["failed"] == 3
+    entries = read_manifest(manifest)[0]
+    assert {i for i, e in entries.items() if e["status"] == "error"} == {"line_2", "line_3", "n"}
+
+def test_retry_failed_reruns_only_failures(tmp_path, site):
+    base_url, hits = site
+    manifest = str(tmp_path / "manifest.jsonl")
+    records = [_url("story-a"), _url("missing-b"), _url("story-c")]
+
+    def run(retry_failed=False):
+        return BatchScheduler(TimelinePipeline(), workers=2,
+                              make_fetcher=lambda: ArticleFetcher(base_url=base_url, retries=0)).run(
+            records, on_result=lambda rec, result: None, manifest=manifest, retry_failed=retry_failed)
+
+    first = run()
+    assert first["done"] == 2 and first["failed"] == 1
+    assert read_manifest(manifest)[0]["missing-b"]["status"] == "error"
+
+    again = run()
+    assert again["total"] == 0 and again["skipped"] == 3
+
+    retried = run(retry_failed=True)
+    assert retried["total"] == 1 and retried["skipped"] == 2
+    assert hits == {"/story-a": 1, "/missing-b": 2, "/story-c": 1}
+
+def test_read_manifest_ignores_uncommitted_tail(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    lines = [{"id": "a", "status": "done"}, {"checkpoint": 1, "outputs": {"out.jsonl": 10}},
+             {"id": "b", "status": "done"}]
+    path.write_text("".join(json.dumps(l) + "\n" for l in lines) + '{"id": "c", "sta')
+    entries, outputs, size = read_manifest(str(path))
+    assert set(entries) == {"a"} and outputs == {"out.jsonl": 10}
+    assert size == len(json.dumps(lines[0]) + "\n" + json.dumps(lines[1]) + "\n")
@@ -0,0 +1,17 @@
+import pytest
+
+from modules.scraper import parse_article_html
+
+BODY = "2024년 3월 3일 시의회가 새 교통 계획을 승인했다."
+
+@pytest.mark.parametrize("charset", ["euc-kr", "EUC-KR", "euc_kr"])  # euc_kr: Python knows it, lxml does not
+def test_non_utf8_cjk_page(charset):
+    html = (f'<html><head><meta charset="{charset}"><title>시의회</title></head>'
+            f"<body><nav>메뉴</nav><article><p>{BODY}</p></article></body></html>").encode("euc-kr")
+    article = parse_article_html(html, "https://news.example.kr/a")
+    assert article["title"] == "시의회"
+    assert article["text"] == BODY
+
+def test_http_charset_wins_over_utf8_default():
+    html = f"<html><body><article><p>{BODY}</p></article></body></html>".encode("euc-kr")
+    assert parse_article_html(html, "https://news.example.kr/a", "euc-kr")["text"] == BODY